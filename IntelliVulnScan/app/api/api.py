@@ -2,9 +2,15 @@ from fastapi import APIRouter
 
 from app.api.endpoints import scans, assets, vulnerabilities, ml
 
+# (router module, URL prefix, OpenAPI tag) for every endpoint group
+ENDPOINT_ROUTERS = (
+    (scans, "/scans", "scans"),
+    (assets, "/assets", "assets"),
+    (vulnerabilities, "/vulnerabilities", "vulnerabilities"),
+    (ml, "/ml", "ml"),
+)
+
 api_router = APIRouter()
 
-api_router.include_router(scans.router, prefix="/scans", tags=["scans"])
-api_router.include_router(assets.router, prefix="/assets", tags=["assets"])
-api_router.include_router(vulnerabilities.router, prefix="/vulnerabilities", tags=["vulnerabilities"])
-api_router.include_router(ml.router, prefix="/ml", tags=["ml"]) 
\ No newline at end of file
+for module, prefix, tag in ENDPOINT_ROUTERS:
+    api_router.include_router(module.router, prefix=prefix, tags=[tag])
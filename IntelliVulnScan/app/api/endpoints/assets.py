@@ -1,111 +1,174 @@
 from typing import List, Optional, Dict, Any
 
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi.responses import ORJSONResponse
 
-from app.api.deps import get_db
-from app.schemas.asset import Asset, AssetCreate, AssetUpdate, AssetVulnerabilitySummary
+from app.api.deps import DB, get_current_active_user
+from app.schemas.asset import Asset, AssetCreate, AssetListItem, AssetUpdate, AssetVulnerabilitySummary
 from app.services import (
+    ASSET_LIST_COLUMNS,
     create_asset,
+    create_assets_bulk,
     get_asset,
     get_assets,
     update_asset,
     delete_asset,
     get_asset_vulnerability_summary,
+    get_asset_vulnerability_summaries,
 )
 
-router = APIRouter()
+router = APIRouter(
+    dependencies=[Depends(get_current_active_user)],
+    default_response_class=ORJSONResponse,
+)
 
 
 @router.post("/", response_model=Asset, status_code=201)
-def create_asset_endpoint(
+async def create_asset_endpoint(
     asset: AssetCreate,
-    db: Session = Depends(get_db),
+    db: DB,
 ):
     """
     Create a new asset.
     """
-    return create_asset(db=db, asset=asset)
+    return await db.run_sync(create_asset, asset=asset)
+
+
+@router.post("/bulk", status_code=201)
+async def create_assets_bulk_endpoint(
+    assets: List[AssetCreate],
+    db: DB,
+) -> Dict[str, int]:
+    """
+    Create many assets in one request.
+    """
+    created = await db.run_sync(create_assets_bulk, assets=assets)
+    return {"created": created}
+
+
+@router.get("/compact", response_model=List[AssetListItem])
+async def read_assets_compact(
+    db: DB,
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=500),
+    after_id: Optional[int] = None,
+    asset_type: Optional[str] = None,
+    environment: Optional[str] = None,
+    criticality: Optional[str] = None,
+    owner: Optional[str] = None,
+):
+    """
+    Get a compact asset listing, loading only the columns it returns.
+    """
+    candidates = (
+        ("asset_type", asset_type),
+        ("environment", environment),
+        ("criticality", criticality),
+        ("owner", owner),
+    )
+    filters = {name: value for name, value in candidates if value is not None}
+    
+    return await db.run_sync(
+        get_assets,
+        skip=skip,
+        limit=limit,
+        filters=filters,
+        after_id=after_id,
+        columns=ASSET_LIST_COLUMNS,
+    )
+
+
+@router.get("/vulnerability-summaries", response_model=List[AssetVulnerabilitySummary])
+async def read_asset_vulnerability_summaries(
+    db: DB,
+    asset_ids: List[int] = Query(..., max_length=500),
+):
+    """
+    Get vulnerability summaries for several assets, e.g. for a dashboard.
+    """
+    summaries = await db.run_sync(get_asset_vulnerability_summaries, asset_ids=asset_ids)
+    return list(summaries.values())
 
 
 @router.get("/{asset_id}", response_model=Asset)
-def read_asset(
+async def read_asset(
     asset_id: int,
-    db: Session = Depends(get_db),
+    db: DB,
 ):
     """
     Get asset by ID.
     """
-    db_asset = get_asset(db=db, asset_id=asset_id)
+    db_asset = await db.run_sync(get_asset, asset_id=asset_id)
     if db_asset is None:
         raise HTTPException(status_code=404, detail="Asset not found")
     return db_asset
 
 
 @router.get("/", response_model=List[Asset])
-def read_assets(
+async def read_assets(
+    db: DB,
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=500),
+    after_id: Optional[int] = None,
     asset_type: Optional[str] = None,
     environment: Optional[str] = None,
     criticality: Optional[str] = None,
     owner: Optional[str] = None,
-    db: Session = Depends(get_db),
 ):
     """
     Get all assets with optional filtering.
     """
-    filters = {}
-    if asset_type:
-        filters["asset_type"] = asset_type
-    if environment:
-        filters["environment"] = environment
-    if criticality:
-        filters["criticality"] = criticality
-    if owner:
-        filters["owner"] = owner
+    candidates = (
+        ("asset_type", asset_type),
+        ("environment", environment),
+        ("criticality", criticality),
+        ("owner", owner),
+    )
+    filters = {name: value for name, value in candidates if value is not None}
     
-    return get_assets(db=db, skip=skip, limit=limit, filters=filters)
+    return await db.run_sync(
+        get_assets, skip=skip, limit=limit, filters=filters, after_id=after_id
+    )
 
 
 @router.put("/{asset_id}", response_model=Asset)
-def update_asset_endpoint(
+async def update_asset_endpoint(
     asset_id: int,
     asset: AssetUpdate,
-    db: Session = Depends(get_db),
+    db: DB,
 ):
     """
     Update an asset.
     """
-    db_asset = update_asset(db=db, asset_id=asset_id, asset=asset)
+    db_asset = await db.run_sync(update_asset, asset_id=asset_id, asset=asset)
     if db_asset is None:
         raise HTTPException(status_code=404, detail="Asset not found")
     return db_asset
 
 
 @router.delete("/{asset_id}", status_code=204)
-def delete_asset_endpoint(
+async def delete_asset_endpoint(
     asset_id: int,
-    db: Session = Depends(get_db),
+    db: DB,
 ):
     """
     Delete an asset.
     """
-    success = delete_asset(db=db, asset_id=asset_id)
+    success = await db.run_sync(delete_asset, asset_id=asset_id)
     if not success:
         raise HTTPException(status_code=404, detail="Asset not found")
     return None
 
 
 @router.get("/{asset_id}/vulnerability-summary", response_model=AssetVulnerabilitySummary)
-def read_asset_vulnerability_summary(
+async def read_asset_vulnerability_summary(
     asset_id: int,
-    db: Session = Depends(get_db),
+    db: DB,
 ):
     """
     Get vulnerability summary for an asset.
     """
-    summary = get_asset_vulnerability_summary(db=db, asset_id=asset_id)
+    summary = await db.run_sync(get_asset_vulnerability_summary, asset_id=asset_id)
     if summary is None:
         raise HTTPException(status_code=404, detail="Asset not found")
     return summary 
\ No newline at end of file
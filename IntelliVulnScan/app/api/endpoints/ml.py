@@ -1,153 +1,170 @@
 from typing import List, Optional, Dict, Any
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Body, BackgroundTasks
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Body
+from fastapi.responses import ORJSONResponse
 
-from app.api.deps import get_db
+from app.api.deps import DB, get_current_active_user
 from app.schemas.ml import MLModel, MLModelCreate, MLModelUpdate, MLPrediction, MLFeatureImportance
 from app.services.ml_service import (
     create_model,
     get_model,
     get_models,
     update_model,
+    set_model_status,
     delete_model,
-    train_model,
-    predict_vulnerability_priority,
+    predict_vulnerability_priority_batched,
+    predict_many,
     get_feature_importance,
 )
+from app.tasks.ml_tasks import train_ml_model_task
 
-router = APIRouter()
+router = APIRouter(
+    dependencies=[Depends(get_current_active_user)],
+    default_response_class=ORJSONResponse,
+)
 
 
 @router.post("/models", response_model=MLModel, status_code=201)
-def create_model_endpoint(
+async def create_model_endpoint(
     model: MLModelCreate,
-    db: Session = Depends(get_db),
+    db: DB,
 ):
     """
     Create a new ML model.
     """
-    return create_model(db=db, model=model)
+    return await db.run_sync(create_model, model=model)
 
 
 @router.get("/models/{model_id}", response_model=MLModel)
-def read_model(
+async def read_model(
     model_id: int,
-    db: Session = Depends(get_db),
+    db: DB,
 ):
     """
     Get ML model by ID.
     """
-    db_model = get_model(db=db, model_id=model_id)
+    db_model = await db.run_sync(get_model, model_id=model_id)
     if db_model is None:
         raise HTTPException(status_code=404, detail="Model not found")
     return db_model
 
 
 @router.get("/models", response_model=List[MLModel])
-def read_models(
+async def read_models(
+    db: DB,
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=500),
+    after_id: Optional[int] = None,
     model_type: Optional[str] = None,
     status: Optional[str] = None,
-    db: Session = Depends(get_db),
 ):
     """
     Get all ML models with optional filtering.
     """
-    filters = {}
-    if model_type:
-        filters["model_type"] = model_type
-    if status:
-        filters["status"] = status
+    candidates = (
+        ("model_type", model_type),
+        ("status", status),
+    )
+    filters = {name: value for name, value in candidates if value is not None}
     
-    return get_models(db=db, skip=skip, limit=limit, filters=filters)
+    return await db.run_sync(
+        get_models, skip=skip, limit=limit, filters=filters, after_id=after_id
+    )
 
 
 @router.put("/models/{model_id}", response_model=MLModel)
-def update_model_endpoint(
+async def update_model_endpoint(
     model_id: int,
     model: MLModelUpdate,
-    db: Session = Depends(get_db),
+    db: DB,
 ):
     """
     Update an ML model.
     """
-    db_model = update_model(db=db, model_id=model_id, model=model)
+    db_model = await db.run_sync(update_model, model_id=model_id, model=model)
     if db_model is None:
         raise HTTPException(status_code=404, detail="Model not found")
     return db_model
 
 
 @router.delete("/models/{model_id}", status_code=204)
-def delete_model_endpoint(
+async def delete_model_endpoint(
     model_id: int,
-    db: Session = Depends(get_db),
+    db: DB,
 ):
     """
     Delete an ML model.
     """
-    success = delete_model(db=db, model_id=model_id)
+    success = await db.run_sync(delete_model, model_id=model_id)
     if not success:
         raise HTTPException(status_code=404, detail="Model not found")
     return None
 
 
 @router.post("/models/{model_id}/train", response_model=MLModel)
-def train_model_endpoint(
+async def train_model_endpoint(
     model_id: int,
-    background_tasks: BackgroundTasks,
+    db: DB,
     training_params: Dict[str, Any] = Body({}),
-    db: Session = Depends(get_db),
 ):
     """
     Train an ML model.
     """
-    db_model = get_model(db=db, model_id=model_id)
+    db_model = await db.run_sync(set_model_status, model_id=model_id, status="training")
     if db_model is None:
         raise HTTPException(status_code=404, detail="Model not found")
     
-    # Start training in background
-    background_tasks.add_task(train_model, db=db, model_id=model_id, params=training_params)
-    
-    # Update model status to training
-    db_model = update_model(db=db, model_id=model_id, model=MLModelUpdate(status="training"))
+    # Start training on the ML worker queue
+    train_ml_model_task.delay(model_id, training_params)
     
     return db_model
 
 
 @router.post("/predict", response_model=MLPrediction)
-def predict_vulnerability_priority_endpoint(
+async def predict_vulnerability_priority_endpoint(
+    db: DB,
     vulnerability_data: Dict[str, Any] = Body(...),
     model_id: Optional[int] = Query(None),
-    db: Session = Depends(get_db),
 ):
     """
     Predict vulnerability priority.
     """
     try:
-        prediction = predict_vulnerability_priority(
-            db=db, vulnerability_data=vulnerability_data, model_id=model_id
+        # Concurrent single predictions are scored together in small batches
+        return await predict_vulnerability_priority_batched(
+            db, vulnerability_data=vulnerability_data, model_id=model_id
         )
-        return prediction
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/predict/batch", response_model=List[MLPrediction])
+async def predict_many_endpoint(
+    db: DB,
+    vulnerabilities: List[Dict[str, Any]] = Body(..., max_length=1000),
+    model_id: Optional[int] = Query(None),
+):
+    """
+    Predict the priority of many vulnerabilities in one model call.
+    """
+    try:
+        return await db.run_sync(predict_many, vulnerabilities=vulnerabilities, model_id=model_id)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get("/models/{model_id}/feature-importance", response_model=List[MLFeatureImportance])
-def get_feature_importance_endpoint(
+async def get_feature_importance_endpoint(
     model_id: int,
-    db: Session = Depends(get_db),
+    db: DB,
 ):
     """
     Get feature importance for an ML model.
     """
-    db_model = get_model(db=db, model_id=model_id)
-    if db_model is None:
-        raise HTTPException(status_code=404, detail="Model not found")
-    
-    feature_importance = get_feature_importance(db=db, model_id=model_id)
+    feature_importance = await db.run_sync(get_feature_importance, model_id=model_id)
     if feature_importance is None:
+        raise HTTPException(status_code=404, detail="Model not found")
+    if not feature_importance:
         raise HTTPException(status_code=404, detail="Feature importance not found")
     
     return feature_importance 
\ No newline at end of file
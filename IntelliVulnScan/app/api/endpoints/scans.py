@@ -1,9 +1,11 @@
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, status
-from sqlalchemy.orm import Session
+from typing import Any, AsyncIterator, Dict, List, Optional
 
-from app.core.database import get_db
-from app.core.security import get_current_user
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import ORJSONResponse, StreamingResponse
+
+from app.api.deps import DB, get_current_active_user
+from app.core.database import AsyncSessionLocal
 from app.schemas.scan import (
     ScanCreate,
     ScanUpdate,
@@ -13,52 +15,57 @@ from app.schemas.scan import (
 from app.services.scan_service import (
     create_scan,
     get_scan,
+    get_scan_status,
     get_scans,
     update_scan,
     delete_scan,
     start_scan,
     stop_scan,
-    get_scan_results,
+    get_scan_result_summary,
+    get_scan_results_iter,
 )
 from app.tasks.scan_tasks import run_scan_task
 
-router = APIRouter()
+router = APIRouter(
+    dependencies=[Depends(get_current_active_user)],
+    default_response_class=ORJSONResponse,
+)
 
 
 @router.get("/", response_model=List[ScanResponse])
 async def read_scans(
+    db: DB,
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=500),
+    after_id: Optional[int] = None,
     status: Optional[str] = None,
     scanner_type: Optional[str] = None,
     asset_id: Optional[int] = None,
-    db: Session = Depends(get_db),
-    current_user: dict = Depends(get_current_user),
 ):
     """
     Retrieve scans with optional filtering.
     """
-    filters = {}
-    if status:
-        filters["status"] = status
-    if scanner_type:
-        filters["scanner_type"] = scanner_type
-    if asset_id:
-        filters["asset_id"] = asset_id
-        
-    return get_scans(db, skip=skip, limit=limit, filters=filters)
+    candidates = (
+        ("status", status),
+        ("scanner_type", scanner_type),
+        ("asset_id", asset_id),
+    )
+    filters = {name: value for name, value in candidates if value is not None}
+    
+    return await db.run_sync(
+        get_scans, skip=skip, limit=limit, filters=filters, after_id=after_id
+    )
 
 
 @router.get("/{scan_id}", response_model=ScanResponse)
 async def read_scan(
     scan_id: int,
-    db: Session = Depends(get_db),
-    current_user: dict = Depends(get_current_user),
+    db: DB,
 ):
     """
     Retrieve a specific scan by ID.
     """
-    scan = get_scan(db, scan_id=scan_id)
+    scan = await db.run_sync(get_scan, scan_id=scan_id)
     if scan is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -70,75 +77,67 @@ async def read_scan(
 @router.post("/", response_model=ScanResponse, status_code=status.HTTP_201_CREATED)
 async def create_scan_endpoint(
     scan: ScanCreate,
-    db: Session = Depends(get_db),
-    current_user: dict = Depends(get_current_user),
+    db: DB,
 ):
     """
     Create a new scan configuration.
     """
-    return create_scan(db, scan=scan)
+    return await db.run_sync(create_scan, scan=scan)
 
 
 @router.put("/{scan_id}", response_model=ScanResponse)
 async def update_scan_endpoint(
     scan_id: int,
     scan: ScanUpdate,
-    db: Session = Depends(get_db),
-    current_user: dict = Depends(get_current_user),
+    db: DB,
 ):
     """
     Update an existing scan configuration.
     """
-    db_scan = get_scan(db, scan_id=scan_id)
+    db_scan = await db.run_sync(update_scan, scan_id=scan_id, scan=scan)
     if db_scan is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Scan not found",
         )
-    return update_scan(db, scan_id=scan_id, scan=scan)
+    return db_scan
 
 
 @router.delete("/{scan_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_scan_endpoint(
     scan_id: int,
-    db: Session = Depends(get_db),
-    current_user: dict = Depends(get_current_user),
+    db: DB,
 ):
     """
     Delete a scan configuration.
     """
-    db_scan = get_scan(db, scan_id=scan_id)
-    if db_scan is None:
+    deleted = await db.run_sync(delete_scan, scan_id=scan_id)
+    if not deleted:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Scan not found",
         )
-    delete_scan(db, scan_id=scan_id)
     return None
 
 
 @router.post("/{scan_id}/start", response_model=ScanResponse)
 async def start_scan_endpoint(
     scan_id: int,
-    background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db),
-    current_user: dict = Depends(get_current_user),
+    db: DB,
 ):
     """
     Start a scan.
     """
-    scan = get_scan(db, scan_id=scan_id)
-    if scan is None:
+    # Update scan status to "running"
+    updated_scan = await db.run_sync(start_scan, scan_id=scan_id)
+    if updated_scan is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Scan not found",
         )
     
-    # Update scan status to "running"
-    updated_scan = start_scan(db, scan_id=scan_id)
-    
-    # Start scan in background
-    background_tasks.add_task(run_scan_task, scan_id=scan_id)
+    # Start scan on the scan worker queue
+    run_scan_task.delay(scan_id)
     
     return updated_scan
 
@@ -146,49 +145,65 @@ async def start_scan_endpoint(
 @router.post("/{scan_id}/stop", response_model=ScanResponse)
 async def stop_scan_endpoint(
     scan_id: int,
-    db: Session = Depends(get_db),
-    current_user: dict = Depends(get_current_user),
+    db: DB,
 ):
     """
     Stop a running scan.
     """
-    scan = get_scan(db, scan_id=scan_id)
-    if scan is None:
+    scan_status = await db.run_sync(get_scan_status, scan_id=scan_id)
+    if scan_status is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Scan not found",
         )
     
-    if scan.status != "running":
+    if scan_status != "running":
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Scan is not running",
         )
     
-    return stop_scan(db, scan_id=scan_id)
+    return await db.run_sync(stop_scan, scan_id=scan_id)
 
 
 @router.get("/{scan_id}/results", response_model=ScanResultResponse)
 async def scan_results_endpoint(
     scan_id: int,
-    db: Session = Depends(get_db),
-    current_user: dict = Depends(get_current_user),
+    db: DB,
 ):
     """
     Get the results of a scan.
+    
+    The vulnerability list is streamed from a server-side cursor instead of being
+    built in memory, so large scans start responding immediately.
     """
-    scan = get_scan(db, scan_id=scan_id)
-    if scan is None:
+    summary = await db.run_sync(get_scan_result_summary, scan_id=scan_id)
+    if summary is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Scan not found",
         )
     
-    results = get_scan_results(db, scan_id=scan_id)
-    if results is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Scan results not found",
-        )
+    return StreamingResponse(
+        _stream_scan_results(summary, scan_id),
+        media_type="application/json",
+    )
+
+
+async def _stream_scan_results(summary: Dict[str, Any], scan_id: int) -> AsyncIterator[bytes]:
+    """
+    Write a scan result as a JSON object whose vulnerability array is streamed row by row.
+    
+    The stream uses its own session because the request session is not guaranteed
+    to outlive the endpoint while the response body is being sent.
+    """
+    # Reopen the summary object so the vulnerability array can be appended to it
+    yield orjson.dumps(summary)[:-1] + b',"vulnerabilities":['
+    
+    separator = b""
+    async with AsyncSessionLocal() as db:
+        async for row in get_scan_results_iter(db, scan_id):
+            yield separator + orjson.dumps(row)
+            separator = b","
     
-    return results 
\ No newline at end of file
+    yield b"]}"
@@ -1,9 +1,9 @@
 from typing import List, Optional, Dict, Any
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Body
-from sqlalchemy.orm import Session
+from fastapi.responses import ORJSONResponse
 
-from app.api.deps import get_db
+from app.api.deps import DB, get_current_active_user
 from app.schemas.vulnerability import Vulnerability, VulnerabilityCreate, VulnerabilityUpdate
 from app.services import (
     create_vulnerability,
@@ -16,38 +16,43 @@ from app.services import (
     get_vulnerability_details,
 )
 
-router = APIRouter()
+router = APIRouter(
+    dependencies=[Depends(get_current_active_user)],
+    default_response_class=ORJSONResponse,
+)
 
 
 @router.post("/", response_model=Vulnerability, status_code=201)
-def create_vulnerability_endpoint(
+async def create_vulnerability_endpoint(
     vulnerability: VulnerabilityCreate,
-    db: Session = Depends(get_db),
+    db: DB,
 ):
     """
     Create a new vulnerability.
     """
-    return create_vulnerability(db=db, vulnerability=vulnerability)
+    return await db.run_sync(create_vulnerability, vulnerability=vulnerability)
 
 
 @router.get("/{vulnerability_id}", response_model=Dict[str, Any])
-def read_vulnerability(
+async def read_vulnerability(
     vulnerability_id: int,
-    db: Session = Depends(get_db),
+    db: DB,
 ):
     """
     Get vulnerability by ID with detailed information.
     """
-    vulnerability_details = get_vulnerability_details(db=db, vulnerability_id=vulnerability_id)
+    vulnerability_details = await db.run_sync(get_vulnerability_details, vulnerability_id=vulnerability_id)
     if vulnerability_details is None:
         raise HTTPException(status_code=404, detail="Vulnerability not found")
     return vulnerability_details
 
 
 @router.get("/", response_model=List[Vulnerability])
-def read_vulnerabilities(
+async def read_vulnerabilities(
+    db: DB,
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=500),
+    after_id: Optional[int] = None,
     severity: Optional[str] = None,
     status: Optional[str] = None,
     asset_id: Optional[int] = None,
@@ -57,75 +62,73 @@ def read_vulnerabilities(
     max_cvss: Optional[float] = None,
     exploit_available: Optional[bool] = None,
     patch_available: Optional[bool] = None,
-    db: Session = Depends(get_db),
 ):
     """
     Get all vulnerabilities with optional filtering.
+    
+    Pass the last ID of the previous page as `after_id` to page by key instead of offset.
     """
-    filters = {}
-    if severity:
-        filters["severity"] = severity
-    if status:
-        filters["status"] = status
-    if asset_id:
-        filters["asset_id"] = asset_id
-    if scan_id:
-        filters["scan_id"] = scan_id
-    if cve_id:
-        filters["cve_id"] = cve_id
-    if min_cvss is not None:
-        filters["min_cvss"] = min_cvss
-    if max_cvss is not None:
-        filters["max_cvss"] = max_cvss
-    if exploit_available is not None:
-        filters["exploit_available"] = exploit_available
-    if patch_available is not None:
-        filters["patch_available"] = patch_available
+    candidates = (
+        ("severity", severity),
+        ("status", status),
+        ("asset_id", asset_id),
+        ("scan_id", scan_id),
+        ("cve_id", cve_id),
+        ("min_cvss", min_cvss),
+        ("max_cvss", max_cvss),
+        ("exploit_available", exploit_available),
+        ("patch_available", patch_available),
+    )
+    filters = {name: value for name, value in candidates if value is not None}
     
-    return get_vulnerabilities(db=db, skip=skip, limit=limit, filters=filters)
+    return await db.run_sync(
+        get_vulnerabilities, skip=skip, limit=limit, filters=filters, after_id=after_id
+    )
 
 
 @router.put("/{vulnerability_id}", response_model=Vulnerability)
-def update_vulnerability_endpoint(
+async def update_vulnerability_endpoint(
     vulnerability_id: int,
     vulnerability: VulnerabilityUpdate,
-    db: Session = Depends(get_db),
+    db: DB,
 ):
     """
     Update a vulnerability.
     """
-    db_vulnerability = update_vulnerability(db=db, vulnerability_id=vulnerability_id, vulnerability=vulnerability)
+    db_vulnerability = await db.run_sync(
+        update_vulnerability, vulnerability_id=vulnerability_id, vulnerability=vulnerability
+    )
     if db_vulnerability is None:
         raise HTTPException(status_code=404, detail="Vulnerability not found")
     return db_vulnerability
 
 
 @router.delete("/{vulnerability_id}", status_code=204)
-def delete_vulnerability_endpoint(
+async def delete_vulnerability_endpoint(
     vulnerability_id: int,
-    db: Session = Depends(get_db),
+    db: DB,
 ):
     """
     Delete a vulnerability.
     """
-    success = delete_vulnerability(db=db, vulnerability_id=vulnerability_id)
+    success = await db.run_sync(delete_vulnerability, vulnerability_id=vulnerability_id)
     if not success:
         raise HTTPException(status_code=404, detail="Vulnerability not found")
     return None
 
 
 @router.put("/{vulnerability_id}/status", response_model=Vulnerability)
-def update_vulnerability_status_endpoint(
+async def update_vulnerability_status_endpoint(
     vulnerability_id: int,
+    db: DB,
     status: str = Body(..., embed=True),
     notes: Optional[str] = Body(None, embed=True),
-    db: Session = Depends(get_db),
 ):
     """
     Update vulnerability status.
     """
-    db_vulnerability = update_vulnerability_status(
-        db=db, vulnerability_id=vulnerability_id, status=status, notes=notes
+    db_vulnerability = await db.run_sync(
+        update_vulnerability_status, vulnerability_id=vulnerability_id, status=status, notes=notes
     )
     if db_vulnerability is None:
         raise HTTPException(status_code=404, detail="Vulnerability not found")
@@ -133,17 +136,20 @@ def update_vulnerability_status_endpoint(
 
 
 @router.put("/{vulnerability_id}/priority", response_model=Vulnerability)
-def update_vulnerability_priority_endpoint(
+async def update_vulnerability_priority_endpoint(
     vulnerability_id: int,
+    db: DB,
     priority: float = Body(..., embed=True),
     explanation: Optional[Dict[str, Any]] = Body(None, embed=True),
-    db: Session = Depends(get_db),
 ):
     """
     Update vulnerability priority.
     """
-    db_vulnerability = update_vulnerability_priority(
-        db=db, vulnerability_id=vulnerability_id, priority=priority, explanation=explanation
+    db_vulnerability = await db.run_sync(
+        update_vulnerability_priority,
+        vulnerability_id=vulnerability_id,
+        priority=priority,
+        explanation=explanation,
     )
     if db_vulnerability is None:
         raise HTTPException(status_code=404, detail="Vulnerability not found")
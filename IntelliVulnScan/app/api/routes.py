@@ -1,27 +0,0 @@
-from fastapi import APIRouter
-
-from app.api.endpoints import (
-    auth,
-    vulnerabilities,
-    assets,
-    scans,
-    reports,
-    ml,
-    integrations,
-    users,
-    settings,
-)
-
-# Create main API router
-api_router = APIRouter()
-
-# Include all endpoint routers
-api_router.include_router(auth.router, prefix="/auth", tags=["Authentication"])
-api_router.include_router(vulnerabilities.router, prefix="/vulnerabilities", tags=["Vulnerabilities"])
-api_router.include_router(assets.router, prefix="/assets", tags=["Assets"])
-api_router.include_router(scans.router, prefix="/scans", tags=["Scans"])
-api_router.include_router(reports.router, prefix="/reports", tags=["Reports"])
-api_router.include_router(ml.router, prefix="/ml", tags=["Machine Learning"])
-api_router.include_router(integrations.router, prefix="/integrations", tags=["Integrations"])
-api_router.include_router(users.router, prefix="/users", tags=["Users"])
-api_router.include_router(settings.router, prefix="/settings", tags=["Settings"]) 
\ No newline at end of file
@@ -4,9 +4,7 @@ from celery import Celery
 from app.core.config import settings
 
 # Redis URL for Celery
-redis_url = f"redis://{settings.REDIS_HOST}:{settings.REDIS_PORT}/{settings.REDIS_DB}"
-if settings.REDIS_PASSWORD:
-    redis_url = f"redis://:{settings.REDIS_PASSWORD}@{settings.REDIS_HOST}:{settings.REDIS_PORT}/{settings.REDIS_DB}"
+redis_url = settings.REDIS_URL
 
 # Create Celery app
 celery_app = Celery(
@@ -25,12 +23,14 @@ celery_app.conf.update(
     task_serializer="json",
     accept_content=["json"],
     result_serializer="json",
+    task_compression="zstd",  # Scan findings are large, repetitive JSON
+    result_compression="zstd",
     timezone="UTC",
     enable_utc=True,
     task_track_started=True,
     task_time_limit=3600,  # 1 hour
     worker_max_tasks_per_child=1000,
-    worker_prefetch_multiplier=1,
+    worker_prefetch_multiplier=1,  # Long-running scans; notification workers override via --prefetch-multiplier
 )
 
 # Optional: Configure task routes
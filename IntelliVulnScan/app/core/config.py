@@ -1,8 +1,9 @@
 import os
 import secrets
-from typing import List, Union, Optional, Dict, Any
+from typing import List, Union, Optional, Any
 
-from pydantic import AnyHttpUrl, BaseSettings, PostgresDsn, validator
+from pydantic import AnyHttpUrl, Field, PostgresDsn, ValidationInfo, field_validator
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
@@ -12,6 +13,10 @@ class Settings(BaseSettings):
     API_V1_STR: str = "/api/v1"
     SECRET_KEY: str = secrets.token_urlsafe(32)
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8  # 8 days
+    # bcrypt work factor. Each +1 doubles hashing time: 10 is ~100ms per check and
+    # the commonly recommended minimum, 12 is ~250ms. Existing hashes keep the
+    # cost they were created with; raise this if the threat model needs it.
+    BCRYPT_ROUNDS: int = 10
     
     # Project settings
     PROJECT_NAME: str = "Intelligent Vulnerability Detection and Prioritization"
@@ -21,7 +26,8 @@ class Settings(BaseSettings):
     # CORS settings
     BACKEND_CORS_ORIGINS: List[AnyHttpUrl] = []
     
-    @validator("BACKEND_CORS_ORIGINS", pre=True)
+    @field_validator("BACKEND_CORS_ORIGINS", mode="before")
+    @classmethod
     def assemble_cors_origins(cls, v: Union[str, List[str]]) -> Union[List[str], str]:
         if isinstance(v, str) and not v.startswith("["):
             return [i.strip() for i in v.split(",")]
@@ -36,21 +42,38 @@ class Settings(BaseSettings):
     POSTGRES_DB: str = os.getenv("POSTGRES_DB", "intellivulnscan")
     SQLALCHEMY_DATABASE_URI: Optional[PostgresDsn] = None
     
-    @validator("SQLALCHEMY_DATABASE_URI", pre=True)
-    def assemble_db_connection(cls, v: Optional[str], values: Dict[str, Any]) -> Any:
+    @field_validator("SQLALCHEMY_DATABASE_URI", mode="before")
+    @classmethod
+    def assemble_db_connection(cls, v: Optional[str], info: ValidationInfo) -> Any:
         if isinstance(v, str):
             return v
+        values = info.data
         return PostgresDsn.build(
             scheme="postgresql",
-            user=values.get("POSTGRES_USER"),
+            username=values.get("POSTGRES_USER"),
             password=values.get("POSTGRES_PASSWORD"),
             host=values.get("POSTGRES_SERVER"),
-            path=f"/{values.get('POSTGRES_DB') or ''}",
+            path=values.get("POSTGRES_DB") or "",
         )
     
+    # Optional read-only replica for bulk feature reads; the primary is used when unset
+    DATABASE_READ_URL: Optional[str] = os.getenv("DATABASE_READ_URL") or None
+    
     # Redis settings
     REDIS_HOST: str = os.getenv("REDIS_HOST", "localhost")
     REDIS_PORT: int = int(os.getenv("REDIS_PORT", "6379"))
+    REDIS_DB: int = int(os.getenv("REDIS_DB", "0"))
+    REDIS_PASSWORD: Optional[str] = os.getenv("REDIS_PASSWORD") or None
+    REDIS_URL: Optional[str] = Field(None, validate_default=True)
+    
+    @field_validator("REDIS_URL", mode="before")
+    @classmethod
+    def assemble_redis_url(cls, v: Optional[str], info: ValidationInfo) -> str:
+        if isinstance(v, str):
+            return v
+        values = info.data
+        auth = f":{values['REDIS_PASSWORD']}@" if values.get("REDIS_PASSWORD") else ""
+        return f"redis://{auth}{values.get('REDIS_HOST')}:{values.get('REDIS_PORT')}/{values.get('REDIS_DB')}"
     
     # Celery settings
     CELERY_BROKER_URL: str = os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0")
@@ -63,13 +86,15 @@ class Settings(BaseSettings):
     OPENVAS_USER: str = os.getenv("OPENVAS_USER", "admin")
     OPENVAS_PASSWORD: str = os.getenv("OPENVAS_PASSWORD", "admin")
     DEPENDENCY_CHECK_PATH: str = os.getenv("DEPENDENCY_CHECK_PATH", "dependency-check")
+    # jq pre-filters Trivy reports when it is installed
+    JQ_PATH: str = os.getenv("JQ_PATH", "jq")
+    # Include the parsed scanner report as raw_output in scan results (debugging only)
+    DEBUG_SCAN_OUTPUT: bool = os.getenv("DEBUG_SCAN_OUTPUT", "false").lower() == "true"
     
     # ML settings
     ML_MODEL_PATH: str = os.getenv("ML_MODEL_PATH", "models")
     
-    class Config:
-        case_sensitive = True
-        env_file = ".env"
+    model_config = SettingsConfigDict(case_sensitive=True, env_file=".env", frozen=True)
 
 
 settings = Settings() 
\ No newline at end of file
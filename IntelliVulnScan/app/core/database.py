@@ -1,44 +1,107 @@
 import logging
-from typing import Generator
+from typing import Any, AsyncGenerator
 
-from sqlalchemy import create_engine
+import orjson
+from sqlalchemy import JSON, create_engine
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
-# Create SQLAlchemy engine
+# Connection pool settings shared by the sync and async engines
+POOL_OPTIONS = {
+    "pool_size": 20,
+    "max_overflow": 10,
+    "pool_timeout": 30,
+    "pool_pre_ping": True,
+    "pool_recycle": 3600,  # 1 hour
+}
+
+
+def _json_serializer(value: Any) -> str:
+    """Encode a JSON column value with orjson; drivers expect text, not bytes."""
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY).decode()
+
+
+# JSON/JSONB columns (scanner_config, model metrics, ...) are encoded and decoded
+# with orjson by every engine
+JSON_OPTIONS = {
+    "json_serializer": _json_serializer,
+    "json_deserializer": orjson.loads,
+}
+
+# psycopg2 batches executemany INSERTs into multi-row VALUES by default; this also
+# pages executemany UPDATEs and DELETEs through execute_batch
+_sync_url = make_url(str(settings.DATABASE_URL))
+_SYNC_DRIVER_OPTIONS = (
+    {"executemany_mode": "values_plus_batch"} if _sync_url.get_driver_name() == "psycopg2" else {}
+)
+
+# Create SQLAlchemy engine (used by Celery workers and scripts)
 engine = create_engine(
-    str(settings.DATABASE_URL),
-    pool_pre_ping=True,
+    _sync_url,
     echo=settings.DEBUG,
+    **POOL_OPTIONS,
+    **JSON_OPTIONS,
+    **_SYNC_DRIVER_OPTIONS,
+)
+
+# Engine for read-only bulk reads such as ML feature queries. With a replica configured
+# these stop competing with writers for primary connections; without one it is the
+# primary engine.
+read_engine = (
+    create_engine(
+        make_url(settings.DATABASE_READ_URL),
+        echo=settings.DEBUG,
+        **{**POOL_OPTIONS, "pool_size": 4, "max_overflow": 4},
+        **JSON_OPTIONS,
+    )
+    if settings.DATABASE_READ_URL
+    else engine
 )
 
-# Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Create session factory; objects stay readable after commit, like the async sessions
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+# Create async SQLAlchemy engine (used by the API)
+async_engine = create_async_engine(
+    make_url(str(settings.DATABASE_URL)).set(drivername="postgresql+asyncpg"),
+    echo=settings.DEBUG,
+    **POOL_OPTIONS,
+    **JSON_OPTIONS,
+)
+
+# Create async session factory
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 
 # Create base class for models
 Base = declarative_base()
 
+# JSON column type stored as binary JSONB on Postgres (plain JSON elsewhere, e.g. SQLite tests)
+JSONType = JSON().with_variant(JSONB(), "postgresql")
+
 
-def get_db() -> Generator[Session, None, None]:
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """
     Dependency for getting DB session.
-    
+
+    Synchronous service functions can be called with ``await db.run_sync(service, ...)``.
+
     Yields:
-        Session: SQLAlchemy session
+        AsyncSession: SQLAlchemy async session
     """
-    db = SessionLocal()
-    try:
-        yield db
-    except Exception as e:
-        logger.error(f"Database session error: {e}")
-        db.rollback()
-        raise
-    finally:
-        db.close()
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+        except Exception as e:
+            logger.error(f"Database session error: {e}")
+            await db.rollback()
+            raise
 
 
 def init_db() -> None:
@@ -46,10 +109,10 @@ def init_db() -> None:
     try:
         # Import models here to ensure they are registered with the Base metadata
         from app.models import vulnerability, asset, scan, user  # noqa
-        
+
         # Create tables
         Base.metadata.create_all(bind=engine)
         logger.info("Database initialized successfully")
     except Exception as e:
         logger.error(f"Database initialization error: {e}")
-        raise 
\ No newline at end of file
+        raise
@@ -1,16 +1,37 @@
-from datetime import datetime, timedelta
+import asyncio
+import base64
+import hashlib
+import hmac
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
 from typing import Any, Dict, Optional, Union
 
+import bcrypt
 import jwt
+import orjson
+from cachetools import TTLCache
 from fastapi import Depends, HTTPException, Security, status
 from fastapi.security import APIKeyHeader, OAuth2PasswordBearer
-from passlib.context import CryptContext
 from pydantic import ValidationError
 
 from app.core.config import settings
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Secret key bytes shared by every HMAC and keyed hash below, encoded once
+_SECRET_KEY_BYTES = settings.SECRET_KEY.encode("utf-8")
+
+# Password hashing work factor
+_BCRYPT_ROUNDS = settings.BCRYPT_ROUNDS
+
+# Successful password verifications, keyed by (hash, HMAC of the plain password),
+# so a burst of logins for the same user pays the bcrypt cost only once.
+_password_cache: TTLCache = TTLCache(maxsize=4096, ttl=30)
+_password_cache_lock = threading.Lock()
+
+# bcrypt releases the GIL, so checks spread across this pool run in parallel
+_BCRYPT_POOL = ThreadPoolExecutor(max_workers=os.cpu_count(), thread_name_prefix="bcrypt")
 
 # OAuth2 token URL
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
@@ -18,15 +39,113 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 # API Key header
 api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
 
+# JWT signing algorithm, resolved once at import
+_JWT_ALGORITHM = "HS256"
+# base64url of {"alg":"HS256","typ":"JWT"}, the only header we issue
+_HS256_HEADER_B64 = b"eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9"
+_DEFAULT_EXPIRE_SECONDS = settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+# Keyed HMAC state; copying it skips re-deriving the inner/outer pads per token
+_HS256_MAC = hmac.new(_SECRET_KEY_BYTES, digestmod=hashlib.sha256)
+
+# Recently validated API keys, keyed by a keyed digest so raw keys are never kept.
+# blake2b keys are limited to 64 bytes. get_api_key, an async dependency, is the
+# only reader and writer, so it is used from the event loop thread alone;
+# invalidate_api_key has to be called from there too.
+_API_KEY_DIGEST_KEY = _SECRET_KEY_BYTES[:64]
+_api_key_cache: TTLCache = TTLCache(maxsize=10000, ttl=60)
+
+
+def _password_cache_key(plain_password: bytes, hashed_password: str) -> tuple:
+    """Return the verification cache key for a password and hash."""
+    return (hashed_password, hmac.new(_SECRET_KEY_BYTES, plain_password, hashlib.sha256).digest())
+
+
+def _is_password_cached(cache_key: tuple) -> bool:
+    """Check whether a verification is in the cache."""
+    with _password_cache_lock:
+        return cache_key in _password_cache
+
+
+def _cache_password(cache_key: tuple) -> None:
+    """Record a successful verification."""
+    with _password_cache_lock:
+        _password_cache[cache_key] = True
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a hash."""
-    return pwd_context.verify(plain_password, hashed_password)
+    plain = plain_password.encode("utf-8")
+    cache_key = _password_cache_key(plain, hashed_password)
+    if _is_password_cached(cache_key):
+        return True
+    
+    if not bcrypt.checkpw(plain, hashed_password.encode("utf-8")):
+        # Failures are never cached
+        return False
+    _cache_password(cache_key)
+    return True
+
+
+async def averify_password(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verify a password against a hash without blocking the event loop.
+    
+    Args:
+        plain_password: Password to check
+        hashed_password: bcrypt hash to check against
+        
+    Returns:
+        True if the password matches, False otherwise
+    """
+    plain = plain_password.encode("utf-8")
+    cache_key = _password_cache_key(plain, hashed_password)
+    if _is_password_cached(cache_key):
+        return True
+    
+    loop = asyncio.get_running_loop()
+    if not await loop.run_in_executor(
+        _BCRYPT_POOL, bcrypt.checkpw, plain, hashed_password.encode("utf-8")
+    ):
+        # Failures are never cached
+        return False
+    _cache_password(cache_key)
+    return True
+
+
+def invalidate_password_cache(hashed_password: str) -> None:
+    """
+    Drop cached verifications for a password hash.
+    
+    Call this when a user's password changes.
+    
+    Args:
+        hashed_password: Previous password hash of the user
+    """
+    with _password_cache_lock:
+        for cache_key in [key for key in _password_cache if key[0] == hashed_password]:
+            _password_cache.pop(cache_key, None)
 
 
 def get_password_hash(password: str) -> str:
     """Generate password hash."""
-    return pwd_context.hash(password)
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds=_BCRYPT_ROUNDS)).decode("utf-8")
+
+
+def _b64url_encode(data: bytes) -> bytes:
+    """Encode data as unpadded base64url."""
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+def _b64url_decode(data: bytes) -> bytes:
+    """Decode unpadded base64url data."""
+    return base64.urlsafe_b64decode(data + b"=" * (-len(data) % 4))
+
+
+def _hs256(signing_input: bytes) -> bytes:
+    """Return the HMAC-SHA256 of a JWT signing input."""
+    mac = _HS256_MAC.copy()
+    mac.update(signing_input)
+    return mac.digest()
 
 
 def create_access_token(subject: str, expires_delta: Optional[timedelta] = None) -> str:
@@ -41,14 +160,65 @@ def create_access_token(subject: str, expires_delta: Optional[timedelta] = None)
         JWT token
     """
     if expires_delta:
-        expire = datetime.utcnow() + expires_delta
+        expire = int(time.time()) + int(expires_delta.total_seconds())
     else:
-        expire = datetime.utcnow() + timedelta(
-            minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
-        )
-    to_encode = {"exp": expire, "sub": str(subject)}
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm="HS256")
-    return encoded_jwt
+        expire = int(time.time()) + _DEFAULT_EXPIRE_SECONDS
+    payload = orjson.dumps({"exp": expire, "sub": str(subject)})
+    signing_input = _HS256_HEADER_B64 + b"." + _b64url_encode(payload)
+    signature = _hs256(signing_input)
+    return (signing_input + b"." + _b64url_encode(signature)).decode("ascii")
+
+
+def _decode_hs256(token: str) -> Dict[str, Any]:
+    """
+    Verify an HS256-signed JWT and return its claims.
+    
+    This is the whole of what PyJWT does for our tokens (one HMAC-SHA256 and an
+    ``exp`` check) without its generic algorithm and claim handling.
+    
+    Args:
+        token: JWT token
+        
+    Returns:
+        Token payload
+        
+    Raises:
+        jwt.DecodeError: If the token is malformed
+        jwt.InvalidAlgorithmError: If the token is not signed with HS256
+        jwt.InvalidSignatureError: If the signature does not match
+        jwt.ExpiredSignatureError: If the token has expired
+    """
+    try:
+        signing_input, signature_b64 = token.encode("ascii").rsplit(b".", 1)
+        header_b64, payload_b64 = signing_input.split(b".")
+        # Tokens we issue carry exactly our header, so it only needs parsing otherwise
+        header = None if header_b64 == _HS256_HEADER_B64 else orjson.loads(_b64url_decode(header_b64))
+        signature = _b64url_decode(signature_b64)
+    except ValueError:
+        raise jwt.DecodeError("Invalid token")
+    
+    if header is not None and (not isinstance(header, dict) or header.get("alg") != _JWT_ALGORITHM):
+        raise jwt.InvalidAlgorithmError("The specified alg value is not allowed")
+    
+    expected = _hs256(signing_input)
+    if not hmac.compare_digest(expected, signature):
+        raise jwt.InvalidSignatureError("Signature verification failed")
+    
+    try:
+        payload = orjson.loads(_b64url_decode(payload_b64))
+    except ValueError:
+        raise jwt.DecodeError("Invalid payload")
+    if not isinstance(payload, dict):
+        raise jwt.DecodeError("Invalid payload")
+    
+    exp = payload.get("exp")
+    if exp is not None:
+        if not isinstance(exp, (int, float)):
+            raise jwt.DecodeError("Expiration Time claim (exp) must be an integer.")
+        if exp <= time.time():
+            raise jwt.ExpiredSignatureError("Signature has expired")
+    
+    return payload
 
 
 def decode_access_token(token: str) -> Dict[str, Any]:
@@ -60,14 +230,17 @@ def decode_access_token(token: str) -> Dict[str, Any]:
         
     Returns:
         Token payload
+        
+    Raises:
+        jwt.PyJWTError: If the token is invalid or expired
     """
-    return jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
+    return _decode_hs256(token)
 
 
 def verify_token(token: str) -> dict:
     """Verify JWT token."""
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
+        payload = _decode_hs256(token)
         return payload
     except (jwt.PyJWTError, ValidationError):
         raise HTTPException(
@@ -92,11 +265,40 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
     return {"id": user_id}
 
 
+def _api_key_digest(api_key: str) -> bytes:
+    """Return the cache key for an API key."""
+    return hashlib.blake2b(api_key.encode(), digest_size=16, key=_API_KEY_DIGEST_KEY).digest()
+
+
+def _validate_api_key(api_key: str) -> bool:
+    """Check an API key against the configured key."""
+    return hmac.compare_digest(api_key.encode(), settings.API_KEY.encode())
+
+
+def invalidate_api_key(api_key: str) -> None:
+    """
+    Drop an API key from the validation cache.
+    
+    Call this whenever a key is revoked so it stops being accepted immediately
+    rather than when its cache entry expires.
+    
+    Args:
+        api_key: API key to invalidate
+    """
+    _api_key_cache.pop(_api_key_digest(api_key), None)
+
+
 async def get_api_key(api_key: str = Security(api_key_header)):
     """Validate API key."""
-    if api_key == settings.API_KEY:
-        return api_key
+    if api_key:
+        digest = _api_key_digest(api_key)
+        if digest in _api_key_cache:
+            return api_key
+        if _validate_api_key(api_key):
+            # Only successful validations are cached
+            _api_key_cache[digest] = True
+            return api_key
     raise HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Invalid API Key",
-    ) 
\ No newline at end of file
+    )
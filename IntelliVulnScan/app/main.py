@@ -1,28 +1,61 @@
 from fastapi import FastAPI, Depends, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 import logging
 import os
+from contextlib import asynccontextmanager
 from typing import List
 
+import bcrypt
+
 from app.api.api import api_router
 from app.core.config import settings
+from app.core.database import async_engine
 from app.core.logging import setup_logging
-from app.core.security import get_api_key
+from app.core.security import create_access_token, decode_access_token, get_api_key
 
 # Setup logging
 setup_logging()
 logger = logging.getLogger(__name__)
 
+# URLs and static payloads, built once at import
+_OPENAPI_URL = f"{settings.API_V1_STR}/openapi.json"
+_DOCS_URL = f"{settings.API_V1_STR}/docs"
+_REDOC_URL = f"{settings.API_V1_STR}/redoc"
+_ROOT_RESPONSE = {
+    "message": "Welcome to the Intelligent Vulnerability Detection and Prioritization API",
+    "docs": _DOCS_URL,
+}
+_HEALTH_RESPONSE = {"status": "ok"}
+_VERSION_RESPONSE = {"version": "1.0.0"}
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run application startup and shutdown."""
+    logger.info("Starting IntelliVulnScan API")
+    
+    # Warm the auth hot paths so the first requests don't pay one-off setup costs
+    bcrypt.checkpw(b"warmup", bcrypt.hashpw(b"warmup", bcrypt.gensalt(rounds=4)))
+    decode_access_token(create_access_token(subject="warmup"))
+    
+    yield
+    
+    logger.info("Shutting down IntelliVulnScan API")
+    await async_engine.dispose()
+
+
 # Initialize FastAPI app
 app = FastAPI(
     title=settings.PROJECT_NAME,
     description=settings.PROJECT_DESCRIPTION,
     version=settings.VERSION,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json",
-    docs_url=f"{settings.API_V1_STR}/docs",
-    redoc_url=f"{settings.API_V1_STR}/redoc",
+    openapi_url=_OPENAPI_URL,
+    docs_url=_DOCS_URL,
+    redoc_url=_REDOC_URL,
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
 # Configure CORS
@@ -45,44 +78,27 @@ if settings.APP_ENV == "production":
 @app.get("/", tags=["Root"])
 async def root():
     """Root endpoint that returns basic API information."""
-    return {
-        "message": "Welcome to the Intelligent Vulnerability Detection and Prioritization API",
-        "docs": f"{settings.API_V1_STR}/docs",
-    }
+    return _ROOT_RESPONSE
 
 @app.get("/health", tags=["Health"])
 async def health_check():
     """Health check endpoint for monitoring."""
-    return {"status": "ok"}
+    return _HEALTH_RESPONSE
 
 @app.get("/version", tags=["Version"])
 async def version():
     """Return the current version of the API."""
-    return {"version": "1.0.0"}
+    return _VERSION_RESPONSE
 
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
     """Global exception handler for unhandled exceptions."""
     logger.error(f"Unhandled exception: {exc}", exc_info=True)
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content={"detail": "An unexpected error occurred."},
     )
 
-# Startup event
-@app.on_event("startup")
-async def startup_event():
-    """Execute tasks on application startup."""
-    logger.info("Starting IntelliVulnScan API")
-    # Initialize database connection, load models, etc.
-
-# Shutdown event
-@app.on_event("shutdown")
-async def shutdown_event():
-    """Execute tasks on application shutdown."""
-    logger.info("Shutting down IntelliVulnScan API")
-    # Close database connections, etc.
-
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
@@ -1,6 +1,6 @@
 from app.models.asset import Asset
 from app.models.scan import Scan
 from app.models.vulnerability import Vulnerability
-from app.models.ml_model import MLModel
+from app.models.ml_model import MLModel, MLModelBlob
 
-__all__ = ["Asset", "Scan", "Vulnerability", "MLModel"] 
\ No newline at end of file
+__all__ = ["Asset", "Scan", "Vulnerability", "MLModel", "MLModelBlob"] 
\ No newline at end of file
@@ -1,6 +1,6 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, Text
 from sqlalchemy.orm import relationship
-from datetime import datetime
+from sqlalchemy.sql import func
 
 from app.core.database import Base
 
@@ -9,11 +9,18 @@ class Asset(Base):
     """Asset model representing a scannable asset."""
     
     __tablename__ = "assets"
+    __table_args__ = (
+        # Filtered listings page by id, so the planner can filter and order from one index
+        Index("ix_assets_type_env_crit_id", "asset_type", "environment", "criticality", "id"),
+    )
+    # Fetch DB-generated timestamps in the INSERT/UPDATE itself, so callers can read
+    # them after commit without a refresh
+    __mapper_args__ = {"eager_defaults": True}
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)
-    asset_type = Column(String(50), nullable=False)  # server, container, application, etc.
+    asset_type = Column(String(50), nullable=False, index=True)  # server, container, application, etc.
     
     # Network information
     hostname = Column(String(255), nullable=True)
@@ -22,16 +29,19 @@ class Asset(Base):
     # System information
     operating_system = Column(String(255), nullable=True)
     owner = Column(String(255), nullable=True)
-    environment = Column(String(50), nullable=True)  # production, staging, development
-    criticality = Column(String(50), nullable=True)  # critical, high, medium, low
+    environment = Column(String(50), nullable=True, index=True)  # production, staging, development
+    criticality = Column(String(50), nullable=True, index=True)  # critical, high, medium, low
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.now)
-    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
     # Relationships
-    scans = relationship("Scan", back_populates="asset", cascade="all, delete-orphan")
-    vulnerabilities = relationship("Vulnerability", back_populates="asset", cascade="all, delete-orphan")
+    # Children are removed by ON DELETE CASCADE, so deletes don't load them
+    scans = relationship("Scan", back_populates="asset", cascade="all, delete-orphan", passive_deletes=True)
+    vulnerabilities = relationship(
+        "Vulnerability", back_populates="asset", cascade="all, delete-orphan", passive_deletes=True
+    )
     
     def __repr__(self):
         return f"<Asset {self.name} ({self.asset_type})>" 
\ No newline at end of file
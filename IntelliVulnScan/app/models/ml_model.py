@@ -1,30 +1,48 @@
 from datetime import datetime
 from typing import Dict, List, Any, Optional
 
-from sqlalchemy import Column, Integer, String, DateTime, LargeBinary, JSON
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, LargeBinary
+from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
-from app.core.database import Base
+from app.core.database import Base, JSONType
 
 
 class MLModel(Base):
     """SQLAlchemy model for ML models."""
     
     __tablename__ = "ml_models"
+    __table_args__ = (
+        Index("ix_ml_models_features_gin", "features", postgresql_using="gin"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
     description = Column(String, nullable=True)
     model_type = Column(String, nullable=False)
     version = Column(String, nullable=True)
-    features = Column(JSON, nullable=True)
-    hyperparameters = Column(JSON, nullable=True)
-    metrics = Column(JSON, nullable=True)
-    feature_importance = Column(JSON, nullable=True)
-    model_data = Column(LargeBinary, nullable=True)
+    features = Column(JSONType, nullable=True)
+    hyperparameters = Column(JSONType, nullable=True)
+    metrics = Column(JSONType, nullable=True)
+    feature_importance = Column(JSONType, nullable=True)
     status = Column(String, nullable=False, default="created")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
+    # Serialized estimator lives in its own table and is never loaded implicitly
+    blob = relationship("MLModelBlob", uselist=False, lazy="noload", passive_deletes=True)
+    
+    def __repr__(self):
+        return f"<MLModel(id={self.id}, name='{self.name}', model_type='{self.model_type}', status='{self.status}')>"
+
+
+class MLModelBlob(Base):
+    """SQLAlchemy model for the serialized estimator of an ML model."""
+    
+    __tablename__ = "ml_model_blobs"
+    
+    model_id = Column(Integer, ForeignKey("ml_models.id", ondelete="CASCADE"), primary_key=True)
+    data = Column(LargeBinary, nullable=False)
+    
     def __repr__(self):
-        return f"<MLModel(id={self.id}, name='{self.name}', model_type='{self.model_type}', status='{self.status}')>" 
\ No newline at end of file
+        return f"<MLModelBlob(model_id={self.model_id})>"
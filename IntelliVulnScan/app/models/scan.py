@@ -1,34 +1,41 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, JSON
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
-from datetime import datetime
+from sqlalchemy.sql import func
 
-from app.core.database import Base
+from app.core.database import Base, JSONType
 
 
 class Scan(Base):
     """Scan model representing a vulnerability scan."""
     
     __tablename__ = "scans"
+    __table_args__ = (
+        Index("ix_scans_status_asset", "status", "asset_id"),
+        Index("ix_scans_asset_created", "asset_id", "created_at"),
+    )
+    # Fetch DB-generated timestamps in the INSERT/UPDATE itself, so callers can read
+    # them after commit without a refresh
+    __mapper_args__ = {"eager_defaults": True}
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)
-    scanner_type = Column(String(50), nullable=False)  # trivy, openvas, dependency-check, custom
+    scanner_type = Column(String(50), nullable=False, index=True)  # trivy, openvas, dependency-check, custom
     
     # Target information
-    asset_id = Column(Integer, ForeignKey("assets.id"), nullable=True)
+    asset_id = Column(Integer, ForeignKey("assets.id", ondelete="CASCADE"), nullable=True, index=True)
     target_type = Column(String(50), nullable=False)  # container, host, application, repository
     target_identifier = Column(String(255), nullable=False)  # URL, IP, container ID, etc.
     
     # Scan configuration
     scan_frequency = Column(String(50), nullable=True)  # once, daily, weekly, monthly
     scan_depth = Column(String(50), default="normal")  # quick, normal, deep
-    scanner_config = Column(JSON, nullable=True)  # Scanner-specific configuration
+    scanner_config = Column(JSONType, nullable=True)  # Scanner-specific configuration
     
     # Scan status
-    status = Column(String(50), default="pending")  # pending, running, completed, failed
-    created_at = Column(DateTime, default=datetime.now)
-    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+    status = Column(String(50), default="pending", index=True)  # pending, running, completed, failed
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     started_at = Column(DateTime, nullable=True)
     completed_at = Column(DateTime, nullable=True)
     
@@ -41,7 +48,15 @@ class Scan(Base):
     
     # Relationships
     asset = relationship("Asset", back_populates="scans")
-    vulnerabilities = relationship("Vulnerability", back_populates="scan", cascade="all, delete-orphan")
+    # A scan can have thousands of vulnerabilities, so they are never lazy loaded;
+    # read them with a query or load them explicitly with selectinload()
+    vulnerabilities = relationship(
+        "Vulnerability",
+        back_populates="scan",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        lazy="raise_on_sql",
+    )
     
     def __repr__(self):
         return f"<Scan {self.name} ({self.scanner_type})>" 
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Text, JSON
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Text, JSON, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -9,18 +9,21 @@ class Vulnerability(Base):
     """Vulnerability model representing a detected vulnerability."""
     
     __tablename__ = "vulnerabilities"
+    __table_args__ = (
+        Index("ix_vulnerabilities_severity_status", "severity", "status"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)
     cve_id = Column(String(50), nullable=True)
     severity = Column(String(50), nullable=False)  # critical, high, medium, low, info
-    cvss_score = Column(Float, nullable=True)
+    cvss_score = Column(Float, nullable=True, index=True)
     cvss_vector = Column(String(255), nullable=True)
     
     # Relationships
-    asset_id = Column(Integer, ForeignKey("assets.id"), nullable=False)
-    scan_id = Column(Integer, ForeignKey("scans.id"), nullable=False)
+    asset_id = Column(Integer, ForeignKey("assets.id", ondelete="CASCADE"), nullable=False, index=True)
+    scan_id = Column(Integer, ForeignKey("scans.id", ondelete="CASCADE"), nullable=False, index=True)
     
     # Status
     status = Column(String(50), default="open")  # open, in_progress, fixed, false_positive, accepted_risk
@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import Optional, List
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class AssetBase(BaseModel):
@@ -41,8 +41,7 @@ class AssetInDB(AssetBase):
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class Asset(AssetInDB):
@@ -55,8 +54,19 @@ class Asset(AssetInDB):
     risk_score: Optional[float] = Field(0.0, description="Risk score for this asset")
     last_scan_date: Optional[datetime] = Field(None, description="Date of the last scan")
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+class AssetListItem(BaseModel):
+    """Schema for the compact asset listing."""
+    id: int
+    name: str
+    asset_type: str
+    environment: str
+    criticality: str
+    owner: Optional[str] = None
+
+    model_config = ConfigDict(from_attributes=True)
 
 
 class AssetVulnerabilitySummary(BaseModel):
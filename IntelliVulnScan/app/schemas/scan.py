@@ -1,6 +1,25 @@
-from typing import List, Dict, Any, Optional
+from typing import Annotated, List, Dict, Any, Optional, Literal
 from datetime import datetime
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, BeforeValidator, ConfigDict, Field
+
+
+def _lower(v: Any) -> Any:
+    """Lowercase string input before it is checked against the allowed values."""
+    return v.lower() if isinstance(v, str) else v
+
+
+def _scan_depth_or_default(v: Any) -> Any:
+    """Lowercase a scan depth, mapping an explicit null to the default "normal" depth."""
+    return "normal" if v is None else _lower(v)
+
+
+# Allowed values are checked by pydantic-core, case-insensitively
+ScannerType = Annotated[Literal["trivy", "openvas", "dependency-check", "custom"], BeforeValidator(_lower)]
+TargetType = Annotated[Literal["container", "host", "application", "repository"], BeforeValidator(_lower)]
+ScanFrequency = Annotated[Literal["once", "daily", "weekly", "monthly"], BeforeValidator(_lower)]
+ScanDepth = Annotated[Literal["quick", "normal", "deep"], BeforeValidator(_lower)]
+# Scan depth of a scan itself, which always has one
+ScanDepthOrDefault = Annotated[Literal["quick", "normal", "deep"], BeforeValidator(_scan_depth_or_default)]
 
 
 class ScanBase(BaseModel):
@@ -8,51 +27,19 @@ class ScanBase(BaseModel):
     
     name: str = Field(..., description="Name of the scan")
     description: Optional[str] = Field(None, description="Description of the scan")
-    scanner_type: str = Field(..., description="Type of scanner (trivy, openvas, dependency-check, custom)")
+    scanner_type: ScannerType = Field(..., description="Type of scanner (trivy, openvas, dependency-check, custom)")
     
     # Target information
     asset_id: Optional[int] = Field(None, description="ID of the asset to scan")
-    target_type: str = Field(..., description="Type of target (container, host, application, repository)")
+    target_type: TargetType = Field(..., description="Type of target (container, host, application, repository)")
     target_identifier: str = Field(..., description="Identifier for the target (URL, IP, container ID, etc.)")
     
     # Scan configuration
-    scan_frequency: Optional[str] = Field(None, description="Frequency for scheduled scans (once, daily, weekly, monthly)")
-    scan_depth: Optional[str] = Field("normal", description="Depth of the scan (quick, normal, deep)")
+    scan_frequency: Optional[ScanFrequency] = Field(None, description="Frequency for scheduled scans (once, daily, weekly, monthly)")
+    scan_depth: ScanDepthOrDefault = Field("normal", description="Depth of the scan (quick, normal, deep)")
     
     # Scanner-specific configuration
     scanner_config: Dict[str, Any] = Field(default_factory=dict, description="Scanner-specific configuration")
-    
-    @validator("scanner_type")
-    def validate_scanner_type(cls, v):
-        allowed_values = ["trivy", "openvas", "dependency-check", "custom"]
-        if v.lower() not in allowed_values:
-            raise ValueError(f"Scanner type must be one of {allowed_values}")
-        return v.lower()
-    
-    @validator("target_type")
-    def validate_target_type(cls, v):
-        allowed_values = ["container", "host", "application", "repository"]
-        if v.lower() not in allowed_values:
-            raise ValueError(f"Target type must be one of {allowed_values}")
-        return v.lower()
-    
-    @validator("scan_frequency")
-    def validate_scan_frequency(cls, v):
-        if v is None:
-            return v
-        allowed_values = ["once", "daily", "weekly", "monthly"]
-        if v.lower() not in allowed_values:
-            raise ValueError(f"Scan frequency must be one of {allowed_values}")
-        return v.lower()
-    
-    @validator("scan_depth")
-    def validate_scan_depth(cls, v):
-        if v is None:
-            return "normal"
-        allowed_values = ["quick", "normal", "deep"]
-        if v.lower() not in allowed_values:
-            raise ValueError(f"Scan depth must be one of {allowed_values}")
-        return v.lower()
 
 
 class ScanCreate(ScanBase):
@@ -66,28 +53,10 @@ class ScanUpdate(BaseModel):
     name: Optional[str] = None
     description: Optional[str] = None
     
-    scan_frequency: Optional[str] = None
-    scan_depth: Optional[str] = None
+    scan_frequency: Optional[ScanFrequency] = None
+    scan_depth: Optional[ScanDepth] = None
     
     scanner_config: Optional[Dict[str, Any]] = None
-    
-    @validator("scan_frequency")
-    def validate_scan_frequency(cls, v):
-        if v is None:
-            return v
-        allowed_values = ["once", "daily", "weekly", "monthly"]
-        if v.lower() not in allowed_values:
-            raise ValueError(f"Scan frequency must be one of {allowed_values}")
-        return v.lower()
-    
-    @validator("scan_depth")
-    def validate_scan_depth(cls, v):
-        if v is None:
-            return v
-        allowed_values = ["quick", "normal", "deep"]
-        if v.lower() not in allowed_values:
-            raise ValueError(f"Scan depth must be one of {allowed_values}")
-        return v.lower()
 
 
 class ScanResponse(ScanBase):
@@ -107,8 +76,7 @@ class ScanResponse(ScanBase):
     medium_count: Optional[int] = None
     low_count: Optional[int] = None
     
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class VulnerabilitySummary(BaseModel):
@@ -145,5 +113,4 @@ class ScanResultResponse(BaseModel):
     # Raw scanner output
     raw_output: Optional[Dict[str, Any]] = None
     
-    class Config:
-        orm_mode = True 
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True) 
\ No newline at end of file
@@ -1,6 +1,12 @@
 from typing import List, Optional, Dict, Any
 from datetime import datetime
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+
+# Allowed values, built once instead of on every validation
+_SEVERITIES = ("critical", "high", "medium", "low", "info")
+_STATUSES = ("open", "in_progress", "fixed", "false_positive", "accepted_risk")
+_SEVERITY_SET = frozenset(_SEVERITIES)
+_STATUS_SET = frozenset(_STATUSES)
 
 
 class VulnerabilityBase(BaseModel):
@@ -33,19 +39,21 @@ class VulnerabilityBase(BaseModel):
     # Custom fields for additional data
     metadata: Optional[Dict[str, Any]] = Field(default_factory=dict, description="Additional metadata as key-value pairs")
     
-    @validator("severity")
+    @field_validator("severity")
+    @classmethod
     def validate_severity(cls, v):
-        allowed_values = ["critical", "high", "medium", "low", "info"]
-        if v.lower() not in allowed_values:
-            raise ValueError(f"Severity must be one of {allowed_values}")
-        return v.lower()
+        value = v.lower()
+        if value not in _SEVERITY_SET:
+            raise ValueError(f"Severity must be one of {list(_SEVERITIES)}")
+        return value
     
-    @validator("status")
+    @field_validator("status")
+    @classmethod
     def validate_status(cls, v):
-        allowed_values = ["open", "in_progress", "fixed", "false_positive", "accepted_risk"]
-        if v.lower() not in allowed_values:
-            raise ValueError(f"Status must be one of {allowed_values}")
-        return v.lower()
+        value = v.lower()
+        if value not in _STATUS_SET:
+            raise ValueError(f"Status must be one of {list(_STATUSES)}")
+        return value
 
 
 class VulnerabilityCreate(VulnerabilityBase):
@@ -73,23 +81,25 @@ class VulnerabilityUpdate(BaseModel):
     
     metadata: Optional[Dict[str, Any]] = None
     
-    @validator("severity")
+    @field_validator("severity")
+    @classmethod
     def validate_severity(cls, v):
         if v is None:
             return v
-        allowed_values = ["critical", "high", "medium", "low", "info"]
-        if v.lower() not in allowed_values:
-            raise ValueError(f"Severity must be one of {allowed_values}")
-        return v.lower()
+        value = v.lower()
+        if value not in _SEVERITY_SET:
+            raise ValueError(f"Severity must be one of {list(_SEVERITIES)}")
+        return value
     
-    @validator("status")
+    @field_validator("status")
+    @classmethod
     def validate_status(cls, v):
         if v is None:
             return v
-        allowed_values = ["open", "in_progress", "fixed", "false_positive", "accepted_risk"]
-        if v.lower() not in allowed_values:
-            raise ValueError(f"Status must be one of {allowed_values}")
-        return v.lower()
+        value = v.lower()
+        if value not in _STATUS_SET:
+            raise ValueError(f"Status must be one of {list(_STATUSES)}")
+        return value
 
 
 class VulnerabilityResponse(VulnerabilityBase):
@@ -99,8 +109,7 @@ class VulnerabilityResponse(VulnerabilityBase):
     created_at: datetime
     updated_at: datetime
     
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class VulnerabilityPriorityResponse(VulnerabilityResponse):
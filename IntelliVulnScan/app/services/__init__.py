@@ -1,22 +1,33 @@
 from app.services.asset_service import (
     create_asset,
+    create_assets_bulk,
     get_asset,
     get_assets,
+    ASSET_LIST_COLUMNS,
     update_asset,
+    update_assets_bulk,
+    asset_updates_from_schemas,
     delete_asset,
     get_asset_vulnerability_summary,
+    get_asset_vulnerability_summaries,
+    invalidate_summary,
 )
 from app.services.scan_service import (
     create_scan,
     get_scan,
+    get_scan_status,
     get_scans,
     update_scan,
     delete_scan,
     start_scan,
     stop_scan,
     update_scan_status,
+    get_scan_severity_counts,
+    get_scan_result_summary,
     get_scan_results,
+    get_scan_results_iter,
     create_vulnerability_from_finding,
+    create_vulnerabilities_from_findings,
 )
 from app.services.vulnerability_service import (
     create_vulnerability,
@@ -32,23 +43,34 @@ from app.services.vulnerability_service import (
 __all__ = [
     # Asset services
     "create_asset",
+    "create_assets_bulk",
     "get_asset",
     "get_assets",
+    "ASSET_LIST_COLUMNS",
     "update_asset",
+    "update_assets_bulk",
+    "asset_updates_from_schemas",
     "delete_asset",
     "get_asset_vulnerability_summary",
+    "get_asset_vulnerability_summaries",
+    "invalidate_summary",
     
     # Scan services
     "create_scan",
     "get_scan",
+    "get_scan_status",
     "get_scans",
     "update_scan",
     "delete_scan",
     "start_scan",
     "stop_scan",
     "update_scan_status",
+    "get_scan_severity_counts",
+    "get_scan_result_summary",
     "get_scan_results",
+    "get_scan_results_iter",
     "create_vulnerability_from_finding",
+    "create_vulnerabilities_from_findings",
     
     # Vulnerability services
     "create_vulnerability",
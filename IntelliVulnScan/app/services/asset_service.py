@@ -1,14 +1,54 @@
+import io
 import logging
-from datetime import datetime
-from typing import Dict, List, Any, Optional
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, List, Any, Optional, Sequence, Tuple, Union
 
-from sqlalchemy.orm import Session
+from cachetools import TTLCache
+from sqlalchemy import Connection, delete, func, insert, select, update
+from sqlalchemy.orm import Session, load_only
+from sqlalchemy.util import await_only
 
 from app.models.asset import Asset
+from app.models.scan import Scan
+from app.models.vulnerability import Vulnerability
 from app.schemas.asset import AssetCreate, AssetUpdate
 
 logger = logging.getLogger(__name__)
 
+# Columns needed by the compact asset listing
+ASSET_LIST_COLUMNS = ("id", "name", "asset_type", "environment", "criticality", "owner")
+
+# Columns that get_assets can filter on, by filter name
+_FILTER_COLS = {
+    "asset_type": Asset.asset_type,
+    "environment": Asset.environment,
+    "criticality": Asset.criticality,
+    "owner": Asset.owner,
+}
+
+# Bulk inserts at least this large use COPY on PostgreSQL
+_COPY_MIN_ROWS = 1000
+
+# Risk score weight of each vulnerability severity
+SEVERITY_WEIGHTS = {"critical": 10, "high": 5, "medium": 2, "low": 0.5}
+
+# Vulnerability summaries by asset ID. Scan and vulnerability writes invalidate
+# their asset's entry; the TTL bounds staleness from writers in other processes.
+_summary_cache: TTLCache = TTLCache(maxsize=10_000, ttl=60)
+_summary_cache_lock = threading.Lock()
+
+
+def invalidate_summary(asset_id: Optional[int]) -> None:
+    """
+    Drop the cached vulnerability summary for an asset.
+    
+    Args:
+        asset_id: ID of the asset whose scans or vulnerabilities changed
+    """
+    with _summary_cache_lock:
+        _summary_cache.pop(asset_id, None)
+
 
 def create_asset(db: Session, asset: AssetCreate) -> Asset:
     """
@@ -31,16 +71,85 @@ def create_asset(db: Session, asset: AssetCreate) -> Asset:
         owner=asset.owner,
         environment=asset.environment,
         criticality=asset.criticality,
-        created_at=datetime.now(),
-        updated_at=datetime.now(),
     )
     db.add(db_asset)
     db.commit()
-    db.refresh(db_asset)
-    logger.info(f"Created asset with ID {db_asset.id}")
+    logger.info("Created asset with ID %s", db_asset.id)
     return db_asset
 
 
+def create_assets_bulk(db: Session, assets: List[AssetCreate]) -> int:
+    """
+    Create many assets with a single multi-row INSERT.
+    
+    Large batches on PostgreSQL are loaded with COPY instead.
+    
+    Args:
+        db: Database session
+        assets: Asset data
+        
+    Returns:
+        Number of assets created
+    """
+    if not assets:
+        return 0
+    
+    rows = [asset.model_dump() for asset in assets]
+    connection = db.connection()
+    if connection.dialect.name == "postgresql" and len(rows) >= _COPY_MIN_ROWS:
+        _copy_assets(connection, rows)
+    else:
+        db.execute(insert(Asset), rows)
+    db.commit()
+    logger.info("Created %s assets", len(rows))
+    return len(rows)
+
+
+def _copy_assets(connection: Connection, rows: List[Dict[str, Any]]) -> None:
+    """
+    Load asset rows with PostgreSQL COPY on the session's connection.
+    
+    Args:
+        connection: Session connection to a PostgreSQL database
+        rows: Asset column values, all with the same keys
+    """
+    columns = list(rows[0])
+    raw_connection = connection.connection
+    
+    if connection.dialect.driver == "asyncpg":
+        # Binary COPY through the asyncpg connection underneath the async session
+        records = [tuple(row[column] for column in columns) for row in rows]
+        await_only(
+            raw_connection.driver_connection.copy_records_to_table(
+                Asset.__tablename__, records=records, columns=columns
+            )
+        )
+        return
+    
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write("\t".join(_copy_text(row[column]) for column in columns))
+        buffer.write("\n")
+    buffer.seek(0)
+    with raw_connection.cursor() as cursor:
+        cursor.copy_expert(
+            f"COPY {Asset.__tablename__} ({', '.join(columns)}) FROM STDIN", buffer
+        )
+
+
+def _copy_text(value: Any) -> str:
+    """Encode a value as a field of COPY's text format."""
+    if value is None:
+        return "\\N"
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
 def get_asset(db: Session, asset_id: int) -> Optional[Asset]:
     """
     Get an asset by ID.
@@ -52,7 +161,7 @@ def get_asset(db: Session, asset_id: int) -> Optional[Asset]:
     Returns:
         Asset if found, None otherwise
     """
-    return db.query(Asset).filter(Asset.id == asset_id).first()
+    return db.get(Asset, asset_id)
 
 
 def get_assets(
@@ -60,35 +169,54 @@ def get_assets(
     skip: int = 0,
     limit: int = 100,
     filters: Optional[Dict[str, Any]] = None,
+    after_id: Optional[int] = None,
+    columns: Optional[Sequence[str]] = None,
 ) -> List[Asset]:
     """
     Get assets with optional filtering.
     
     Args:
         db: Database session
-        skip: Number of records to skip
+        skip: Number of records to skip (ignored when after_id is given)
         limit: Maximum number of records to return
         filters: Optional filters
+        after_id: Only return records with an ID greater than this (keyset pagination)
+        columns: Only load these columns (e.g. ASSET_LIST_COLUMNS); other attributes
+            are left unloaded and must not be accessed outside the session
         
     Returns:
         List of assets
     """
+    # Collect every condition first so the query is filtered once
+    clauses = []
+    if filters:
+        clauses = [
+            column == filters[name]
+            for name, column in _FILTER_COLS.items()
+            if filters.get(name) is not None
+        ]
+    if after_id is not None:
+        clauses.append(Asset.id > after_id)
+    
     query = db.query(Asset)
+    if columns:
+        query = query.options(load_only(*(getattr(Asset, column) for column in columns)))
+    if clauses:
+        query = query.filter(*clauses)
     
-    if filters:
-        if "asset_type" in filters:
-            query = query.filter(Asset.asset_type == filters["asset_type"])
-        if "environment" in filters:
-            query = query.filter(Asset.environment == filters["environment"])
-        if "criticality" in filters:
-            query = query.filter(Asset.criticality == filters["criticality"])
-        if "owner" in filters:
-            query = query.filter(Asset.owner == filters["owner"])
+    query = query.order_by(Asset.id)
+    if after_id is None:
+        query = query.offset(skip)
     
-    return query.offset(skip).limit(limit).all()
+    return query.limit(limit).all()
 
 
-def update_asset(db: Session, asset_id: int, asset: AssetUpdate) -> Optional[Asset]:
+def update_asset(
+    db: Session,
+    asset_id: int,
+    asset: AssetUpdate,
+    return_object: bool = True,
+) -> Union[Optional[Asset], bool]:
     """
     Update an asset.
     
@@ -96,10 +224,25 @@ def update_asset(db: Session, asset_id: int, asset: AssetUpdate) -> Optional[Ass
         db: Database session
         asset_id: ID of the asset to update
         asset: Updated asset data
+        return_object: If False, skip loading the asset and issue a single UPDATE
         
     Returns:
-        Updated asset if found, None otherwise
+        Updated asset if found, None otherwise; with return_object=False, whether
+        the asset was found
     """
+    if not return_object:
+        result = db.execute(
+            update(Asset)
+            .where(Asset.id == asset_id)
+            .values(updated_at=func.now(), **asset.model_dump(exclude_unset=True))
+        )
+        db.commit()
+        if not result.rowcount:
+            return False
+        invalidate_summary(asset_id)
+        logger.info("Updated asset with ID %s", asset_id)
+        return True
+    
     db_asset = get_asset(db, asset_id)
     if not db_asset:
         return None
@@ -108,13 +251,52 @@ def update_asset(db: Session, asset_id: int, asset: AssetUpdate) -> Optional[Ass
     for field, value in asset.dict(exclude_unset=True).items():
         setattr(db_asset, field, value)
     
-    db_asset.updated_at = datetime.now()
+    # updated_at is set by its onupdate default and read back with the UPDATE
     db.commit()
-    db.refresh(db_asset)
-    logger.info(f"Updated asset with ID {db_asset.id}")
+    invalidate_summary(asset_id)
+    logger.info("Updated asset with ID %s", asset_id)
     return db_asset
 
 
+def update_assets_bulk(db: Session, updates: List[Dict[str, Any]]) -> int:
+    """
+    Update many assets by primary key in one executemany UPDATE.
+    
+    Args:
+        db: Database session
+        updates: Dictionaries holding the asset ``id`` and the fields to change,
+            e.g. ``[{"id": 1, "criticality": "high"}, ...]``
+        
+    Returns:
+        Number of update rows submitted
+    """
+    if not updates:
+        return 0
+    
+    db.execute(update(Asset), updates)
+    db.commit()
+    for row in updates:
+        invalidate_summary(row["id"])
+    logger.info("Updated %s assets", len(updates))
+    return len(updates)
+
+
+def asset_updates_from_schemas(updates: List[Tuple[int, AssetUpdate]]) -> List[Dict[str, Any]]:
+    """
+    Convert ``(asset_id, AssetUpdate)`` pairs to rows for ``update_assets_bulk``.
+    
+    Args:
+        updates: Asset IDs with their update data
+        
+    Returns:
+        Update rows containing only the fields that were set
+    """
+    return [
+        {"id": asset_id, **asset.model_dump(exclude_unset=True)}
+        for asset_id, asset in updates
+    ]
+
+
 def delete_asset(db: Session, asset_id: int) -> bool:
     """
     Delete an asset.
@@ -126,13 +308,14 @@ def delete_asset(db: Session, asset_id: int) -> bool:
     Returns:
         True if deleted, False otherwise
     """
-    db_asset = get_asset(db, asset_id)
-    if not db_asset:
+    # Scans and vulnerabilities go with it through ON DELETE CASCADE
+    result = db.execute(delete(Asset).where(Asset.id == asset_id))
+    db.commit()
+    if not result.rowcount:
         return False
+    invalidate_summary(asset_id)
     
-    db.delete(db_asset)
-    db.commit()
-    logger.info(f"Deleted asset with ID {asset_id}")
+    logger.info("Deleted asset with ID %s", asset_id)
     return True
 
 
@@ -147,46 +330,172 @@ def get_asset_vulnerability_summary(db: Session, asset_id: int) -> Optional[Dict
     Returns:
         Vulnerability summary if asset found, None otherwise
     """
-    db_asset = get_asset(db, asset_id)
-    if not db_asset:
+    with _summary_cache_lock:
+        cached = _summary_cache.get(asset_id)
+    if cached is not None:
+        return cached
+    
+    asset_name = db.query(Asset.name).filter(Asset.id == asset_id).scalar()
+    if asset_name is None:
         return None
     
-    # Get vulnerability counts by severity
-    critical_count = sum(1 for vuln in db_asset.vulnerabilities if vuln.severity == "critical")
-    high_count = sum(1 for vuln in db_asset.vulnerabilities if vuln.severity == "high")
-    medium_count = sum(1 for vuln in db_asset.vulnerabilities if vuln.severity == "medium")
-    low_count = sum(1 for vuln in db_asset.vulnerabilities if vuln.severity == "low")
+    # Count every bucket in a single pass over the asset's vulnerabilities
+    counts = (
+        db.query(
+            func.count().label("total"),
+            func.count().filter(Vulnerability.severity == "critical").label("critical"),
+            func.count().filter(Vulnerability.severity == "high").label("high"),
+            func.count().filter(Vulnerability.severity == "medium").label("medium"),
+            func.count().filter(Vulnerability.severity == "low").label("low"),
+            func.count().filter(Vulnerability.status == "open").label("open"),
+            func.count().filter(Vulnerability.status == "closed").label("closed"),
+        )
+        .filter(Vulnerability.asset_id == asset_id)
+        .one()
+    )
+    severity_counts = {severity: getattr(counts, severity) for severity in SEVERITY_WEIGHTS}
+    
+    # Get last scan information if available
+    last_scan = (
+        db.query(Scan.id, Scan.name, Scan.created_at, Scan.status)
+        .filter(Scan.asset_id == asset_id)
+        .order_by(Scan.created_at.desc())
+        .first()
+    )
+    
+    summary = _build_summary(
+        asset_id, asset_name, counts.total, severity_counts, counts.open, counts.closed, last_scan
+    )
+    with _summary_cache_lock:
+        _summary_cache[asset_id] = summary
+    return summary
+
+
+def get_asset_vulnerability_summaries(
+    db: Session, asset_ids: Sequence[int]
+) -> Dict[int, Dict[str, Any]]:
+    """
+    Get vulnerability summaries for many assets at once.
     
-    # Get open vs closed counts
-    open_count = sum(1 for vuln in db_asset.vulnerabilities if vuln.status == "open")
-    closed_count = sum(1 for vuln in db_asset.vulnerabilities if vuln.status == "closed")
+    Cached summaries are reused; the rest are computed with one grouped count over
+    the vulnerabilities and one windowed query for each asset's latest scan.
     
+    Args:
+        db: Database session
+        asset_ids: IDs of the assets
+        
+    Returns:
+        Vulnerability summaries keyed by asset ID; unknown assets are omitted
+    """
+    summaries: Dict[int, Dict[str, Any]] = {}
+    with _summary_cache_lock:
+        for asset_id in asset_ids:
+            cached = _summary_cache.get(asset_id)
+            if cached is not None:
+                summaries[asset_id] = cached
+    
+    missing = [asset_id for asset_id in set(asset_ids) if asset_id not in summaries]
+    if not missing:
+        return summaries
+    
+    asset_names = dict(db.query(Asset.id, Asset.name).filter(Asset.id.in_(missing)).all())
+    if not asset_names:
+        return summaries
+    
+    severity_counts: Dict[int, Counter] = defaultdict(Counter)
+    status_counts: Dict[int, Counter] = defaultdict(Counter)
+    rows = (
+        db.query(Vulnerability.asset_id, Vulnerability.severity, Vulnerability.status, func.count())
+        .filter(Vulnerability.asset_id.in_(asset_names))
+        .group_by(Vulnerability.asset_id, Vulnerability.severity, Vulnerability.status)
+    )
+    for asset_id, severity, status, count in rows:
+        severity_counts[asset_id][severity] += count
+        status_counts[asset_id][status] += count
+    
+    # Latest scan per asset in one pass
+    ranked = (
+        select(
+            Scan.asset_id,
+            Scan.id,
+            Scan.name,
+            Scan.created_at,
+            Scan.status,
+            func.row_number()
+            .over(partition_by=Scan.asset_id, order_by=Scan.created_at.desc())
+            .label("row_number"),
+        )
+        .where(Scan.asset_id.in_(asset_names))
+        .subquery()
+    )
+    last_scans = {
+        row.asset_id: row
+        for row in db.execute(select(ranked).where(ranked.c.row_number == 1))
+    }
+    
+    computed = {}
+    for asset_id, asset_name in asset_names.items():
+        severities = severity_counts[asset_id]
+        statuses = status_counts[asset_id]
+        computed[asset_id] = _build_summary(
+            asset_id,
+            asset_name,
+            sum(severities.values()),
+            {severity: severities[severity] for severity in SEVERITY_WEIGHTS},
+            statuses["open"],
+            statuses["closed"],
+            last_scans.get(asset_id),
+        )
+    
+    with _summary_cache_lock:
+        _summary_cache.update(computed)
+    summaries.update(computed)
+    return summaries
+
+
+def _build_summary(
+    asset_id: int,
+    asset_name: str,
+    total: int,
+    severity_counts: Dict[str, int],
+    open_count: int,
+    closed_count: int,
+    last_scan: Optional[Any],
+) -> Dict[str, Any]:
+    """
+    Assemble an asset vulnerability summary from its counts.
+    
+    Args:
+        asset_id: ID of the asset
+        asset_name: Name of the asset
+        total: Total number of vulnerabilities
+        severity_counts: Vulnerability counts keyed by severity
+        open_count: Number of open vulnerabilities
+        closed_count: Number of closed vulnerabilities
+        last_scan: Row with the id, name, created_at and status of the latest scan, if any
+        
+    Returns:
+        Vulnerability summary
+    """
     # Calculate risk score (simple weighted calculation)
-    risk_score = (
-        critical_count * 10 +
-        high_count * 5 +
-        medium_count * 2 +
-        low_count * 0.5
+    risk_score = float(
+        sum(SEVERITY_WEIGHTS[severity] * count for severity, count in severity_counts.items())
     )
     
-    # Create summary
     summary = {
-        "asset_id": db_asset.id,
-        "asset_name": db_asset.name,
-        "total_vulnerabilities": len(db_asset.vulnerabilities),
-        "critical_count": critical_count,
-        "high_count": high_count,
-        "medium_count": medium_count,
-        "low_count": low_count,
+        "asset_id": asset_id,
+        "asset_name": asset_name,
+        "total_vulnerabilities": total,
+        "critical_count": severity_counts["critical"],
+        "high_count": severity_counts["high"],
+        "medium_count": severity_counts["medium"],
+        "low_count": severity_counts["low"],
         "open_count": open_count,
         "closed_count": closed_count,
         "risk_score": risk_score,
         "last_scan": None,
     }
-    
-    # Get last scan information if available
-    if db_asset.scans:
-        last_scan = max(db_asset.scans, key=lambda scan: scan.created_at)
+    if last_scan:
         summary["last_scan"] = {
             "scan_id": last_scan.id,
             "scan_name": last_scan.name,
@@ -194,4 +503,4 @@ def get_asset_vulnerability_summary(db: Session, asset_id: int) -> Optional[Dict
             "status": last_scan.status,
         }
     
-    return summary 
\ No newline at end of file
+    return summary
@@ -1,264 +1,120 @@
+import asyncio
+import io
 import logging
 import os
-import json
-import pickle
+import threading
 from datetime import datetime
-from typing import Dict, List, Any, Optional, Tuple
+from functools import lru_cache
+from typing import Dict, List, Any, Mapping, Optional, Sequence, Tuple, Union
 
 import numpy as np
 import pandas as pd
-from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
+from sklearn.ensemble import HistGradientBoostingRegressor
+from sklearn.inspection import permutation_importance
 from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler
-from sklearn.metrics import (
-    accuracy_score, precision_score, recall_score, f1_score,
-    roc_auc_score, confusion_matrix, mean_squared_error, mean_absolute_error, r2_score
-)
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 import joblib
-from sqlalchemy.orm import Session
+from cachetools import LRUCache
+from joblib import Parallel, delayed
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, load_only
 
-from app.core.config import settings
+from app.core.database import read_engine
 from app.models.vulnerability import Vulnerability
-from app.models.ml_model import MLModel
+from app.models.ml_model import MLModel, MLModelBlob
 from app.schemas.ml import MLModelCreate, MLModelUpdate, MLPrediction, MLFeatureImportance
 
 logger = logging.getLogger(__name__)
 
+# Deserialized estimators of stored models, keyed by (model ID, updated_at)
+_estimator_cache: LRUCache = LRUCache(maxsize=8)
+_estimator_cache_lock = threading.Lock()
+# Held while a missing estimator is deserialized, so concurrent first requests
+# wait for one load instead of each doing it
+_estimator_load_lock = threading.Lock()
 
-def load_model():
-    """Load the trained ML model."""
-    model_path = settings.MODEL_PATH
-    if not os.path.exists(model_path):
-        logger.warning(f"Model not found at {model_path}")
-        return None
-    
-    try:
-        model = joblib.load(model_path)
-        logger.info(f"Model loaded from {model_path}")
-        return model
-    except Exception as e:
-        logger.error(f"Error loading model: {e}")
-        return None
+# Single predictions waiting to be scored together, keyed by model ID: the queued
+# (encoded feature row, future) pairs and an event set once the batch is full.
+# predict_vulnerability_priority_batched opens, joins and closes batches without
+# awaiting in between, so requests on the one event loop cannot interleave there.
+_PendingBatch = Tuple[List[Tuple[np.ndarray, asyncio.Future]], asyncio.Event]
+_pending_predictions: Dict[Optional[int], _PendingBatch] = {}
+_BATCH_MAX_SIZE = 32
+_BATCH_MAX_DELAY = 0.005  # seconds
 
+# One-hot encoded vulnerability fields: (field, default value, categories)
+_CATEGORICAL_FEATURES = (
+    ("severity", "low", ("critical", "high", "medium", "low")),
+    ("exploit_maturity", "", ("high", "functional", "poc", "unproven")),
+    ("business_impact", "", ("critical", "high", "medium", "low")),
+    ("data_classification", "", ("restricted", "confidential", "internal", "public")),
+    ("system_exposure", "", ("internet", "intranet", "internal", "isolated")),
+)
 
-def load_model_metadata():
-    """Load model metadata."""
-    metadata_path = os.path.splitext(settings.MODEL_PATH)[0] + "_metadata.json"
-    if not os.path.exists(metadata_path):
-        logger.warning(f"Model metadata not found at {metadata_path}")
-        return {}
-    
-    try:
-        with open(metadata_path, "r") as f:
-            metadata = json.load(f)
-        return metadata
-    except Exception as e:
-        logger.error(f"Error loading model metadata: {e}")
-        return {}
+# Column order of the matrices built by _build_feature_matrix
+_FEATURE_NAMES = ("cvss_score", "exploit_available", "patch_available") + tuple(
+    f"{field}_{category}" for field, _, categories in _CATEGORICAL_FEATURES for category in categories
+)
 
 
-def preprocess_data(data: pd.DataFrame) -> Tuple[pd.DataFrame, Optional[StandardScaler]]:
-    """
-    Preprocess data for model training or prediction.
-    
-    Args:
-        data: DataFrame with vulnerability data
-        
-    Returns:
-        Tuple of preprocessed data and scaler
-    """
-    # Handle missing values
-    data = data.fillna({
-        'cvss_score': 0.0,
-        'exploit_available': False,
-        'patch_available': False,
-    })
-    
-    # Convert categorical variables to one-hot encoding
-    categorical_cols = ['severity', 'business_impact', 'data_classification', 'system_exposure']
-    data_encoded = pd.get_dummies(data, columns=categorical_cols, drop_first=False)
-    
-    # Scale numerical features
-    numerical_cols = ['cvss_score']
-    if numerical_cols:
-        scaler = StandardScaler()
-        data_encoded[numerical_cols] = scaler.fit_transform(data_encoded[numerical_cols])
-    else:
-        scaler = None
-    
-    return data_encoded, scaler
+# Vulnerability columns read for model evaluation
+_EVALUATION_DATA_QUERY = select(
+    Vulnerability.cvss_score,
+    Vulnerability.exploit_available,
+    Vulnerability.patch_available,
+    Vulnerability.severity,
+    Vulnerability.exploit_maturity,
+    Vulnerability.business_impact,
+    Vulnerability.data_classification,
+    Vulnerability.system_exposure,
+    Vulnerability.priority,
+)
 
 
-def train_model(
-    db: Session,
-    dataset_path: Optional[str] = None,
-    model_params: Optional[Dict[str, Any]] = None,
-    features: Optional[List[str]] = None,
-    target: str = "priority",
-) -> Dict[str, Any]:
+def evaluate_model(db: Session, model_id: Optional[int] = None) -> Optional[Dict[str, Any]]:
     """
-    Train a machine learning model for vulnerability prioritization.
+    Evaluate a stored model against the priorities recorded on the vulnerabilities.
     
-    Args:
-        db: Database session
-        dataset_path: Path to the dataset file
-        model_params: Parameters for the ML model
-        features: List of feature columns to use
-        target: Target column for training
-        
-    Returns:
-        Dictionary with training results
-    """
-    try:
-        # Load data
-        if dataset_path and os.path.exists(dataset_path):
-            data = pd.read_csv(dataset_path)
-            logger.info(f"Loaded data from {dataset_path}")
-        else:
-            # If no dataset provided, use vulnerabilities from the database
-            vulnerabilities = db.query(Vulnerability).all()
-            if not vulnerabilities:
-                logger.error("No vulnerabilities found in the database")
-                return {"status": "failed", "message": "No vulnerabilities found in the database"}
-            
-            data = pd.DataFrame([v.__dict__ for v in vulnerabilities])
-            logger.info(f"Loaded {len(data)} vulnerabilities from the database")
-        
-        # Preprocess data
-        data_processed, scaler = preprocess_data(data)
-        
-        # Select features
-        if features:
-            X = data_processed[features]
-        else:
-            # Exclude non-feature columns
-            exclude_cols = [target, 'id', 'created_at', 'updated_at', 'title', 'description', 'cve_id']
-            X = data_processed.drop(columns=[col for col in exclude_cols if col in data_processed.columns])
-        
-        y = data_processed[target]
-        
-        # Split data
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-        
-        # Set default model parameters if not provided
-        if not model_params:
-            model_params = {
-                'n_estimators': 100,
-                'max_depth': 10,
-                'random_state': 42,
-            }
-        
-        # Train model
-        model = GradientBoostingClassifier(**model_params)
-        model.fit(X_train, y_train)
-        
-        # Evaluate model
-        y_pred = model.predict(X_test)
-        accuracy = accuracy_score(y_test, y_pred)
-        
-        # Save model
-        os.makedirs(os.path.dirname(settings.MODEL_PATH), exist_ok=True)
-        joblib.dump(model, settings.MODEL_PATH)
-        
-        # Save feature names
-        feature_names = X.columns.tolist()
-        
-        # Save scaler if used
-        if scaler:
-            scaler_path = os.path.splitext(settings.MODEL_PATH)[0] + "_scaler.pkl"
-            with open(scaler_path, "wb") as f:
-                pickle.dump(scaler, f)
-        
-        # Save metadata
-        metadata = {
-            "model_name": "GradientBoostingClassifier",
-            "model_version": "1.0",
-            "training_date": datetime.now().isoformat(),
-            "accuracy": accuracy,
-            "feature_names": feature_names,
-            "model_params": model_params,
-            "dataset_size": len(data),
-            "training_size": len(X_train),
-            "test_size": len(X_test),
-        }
-        
-        metadata_path = os.path.splitext(settings.MODEL_PATH)[0] + "_metadata.json"
-        with open(metadata_path, "w") as f:
-            json.dump(metadata, f, indent=2)
-        
-        logger.info(f"Model trained and saved to {settings.MODEL_PATH}")
-        return {
-            "status": "success",
-            "message": f"Model trained with accuracy {accuracy:.4f}",
-            "accuracy": accuracy,
-            "model_path": settings.MODEL_PATH,
-        }
-    
-    except Exception as e:
-        logger.error(f"Error training model: {e}", exc_info=True)
-        return {"status": "failed", "message": str(e)}
-
-
-def evaluate_model(db: Session) -> Optional[Dict[str, Any]]:
-    """
-    Evaluate the current ML model and return performance metrics.
+    The vulnerabilities are read through the read-only engine, so a configured
+    replica serves this bulk read.
     
     Args:
         db: Database session
+        model_id: Optional model ID; defaults to the latest trained model
         
     Returns:
-        Dictionary with evaluation metrics
+        Dictionary with evaluation metrics, or None if there is no trained model
+        or nothing to evaluate it on
     """
-    model = load_model()
-    if not model:
+    db_model = _get_latest_model(db, model_id)
+    if not db_model:
+        logger.warning("No trained model found to evaluate")
         return None
     
-    metadata = load_model_metadata()
-    
     try:
-        # Load test data
-        vulnerabilities = db.query(Vulnerability).all()
-        if not vulnerabilities:
+        # Load test data column-wise
+        with read_engine.connect() as connection:
+            data = pd.read_sql(_EVALUATION_DATA_QUERY, connection)
+        if data.empty:
             logger.error("No vulnerabilities found in the database")
             return None
         
-        data = pd.DataFrame([v.__dict__ for v in vulnerabilities])
-        
-        # Preprocess data
-        data_processed, _ = preprocess_data(data)
-        
-        # Get feature names from metadata
-        feature_names = metadata.get("feature_names", [])
-        if not feature_names:
-            logger.error("No feature names found in metadata")
-            return None
-        
-        # Select features
-        X = data_processed[feature_names]
-        y = data_processed["priority"]
-        
-        # Make predictions
-        y_pred = model.predict(X)
-        y_pred_proba = model.predict_proba(X)[:, 1]
-        
-        # Calculate metrics
-        metrics = {
-            "accuracy": accuracy_score(y, y_pred),
-            "precision": precision_score(y, y_pred, average="weighted"),
-            "recall": recall_score(y, y_pred, average="weighted"),
-            "f1": f1_score(y, y_pred, average="weighted"),
-            "confusion_matrix": confusion_matrix(y, y_pred).tolist(),
-        }
-        
-        # Add ROC AUC if binary classification
-        if len(np.unique(y)) == 2:
-            metrics["roc_auc"] = roc_auc_score(y, y_pred_proba)
+        # Encode straight into the model's feature columns, as live prediction does
+        X = _build_feature_matrix_from_frame(data)
+        y = data["priority"].to_numpy(dtype=np.float64, na_value=0.0)
+        y_pred = _load_estimator(db, db_model).predict(X)
         
         return {
-            "model_name": metadata.get("model_name", "Unknown"),
-            "model_version": metadata.get("model_version", "Unknown"),
-            "training_date": metadata.get("training_date", "Unknown"),
-            "metrics": metrics,
+            "model_id": db_model.id,
+            "model_name": db_model.name,
+            "model_version": db_model.version,
+            "training_date": db_model.updated_at,
+            "metrics": {
+                "r2": float(r2_score(y, y_pred)),
+                "mean_squared_error": float(mean_squared_error(y, y_pred)),
+                "mean_absolute_error": float(mean_absolute_error(y, y_pred)),
+            },
             "dataset_size": len(data),
         }
     
@@ -267,165 +123,61 @@ def evaluate_model(db: Session) -> Optional[Dict[str, Any]]:
         return None
 
 
-def get_feature_importance(db: Session) -> Optional[Dict[str, Any]]:
-    """
-    Get feature importance from the current ML model.
-    
-    Args:
-        db: Database session
-        
-    Returns:
-        Dictionary with feature importance
-    """
-    model = load_model()
-    if not model:
-        return None
-    
-    metadata = load_model_metadata()
-    
-    try:
-        # Get feature names from metadata
-        feature_names = metadata.get("feature_names", [])
-        if not feature_names:
-            logger.error("No feature names found in metadata")
-            return None
-        
-        # Get feature importance
-        if hasattr(model, "feature_importances_"):
-            importances = model.feature_importances_
-        else:
-            logger.error("Model does not have feature importances")
-            return None
-        
-        # Create feature importance list
-        features = []
-        for name, importance in zip(feature_names, importances):
-            if importance >= settings.FEATURE_IMPORTANCE_THRESHOLD:
-                features.append({
-                    "feature": name,
-                    "importance": float(importance),
-                    "description": get_feature_description(name),
-                })
-        
-        # Sort by importance
-        features.sort(key=lambda x: x["importance"], reverse=True)
-        
-        return {
-            "model_name": metadata.get("model_name", "Unknown"),
-            "model_version": metadata.get("model_version", "Unknown"),
-            "features": features,
-            "threshold": settings.FEATURE_IMPORTANCE_THRESHOLD,
-        }
-    
-    except Exception as e:
-        logger.error(f"Error getting feature importance: {e}", exc_info=True)
-        return None
+# Helper functions
 
+_FEATURE_DESCRIPTIONS = {
+    "cvss_score": "CVSS score indicating the severity of the vulnerability",
+    "exploit_available": "Whether an exploit is publicly available",
+    "patch_available": "Whether a patch is available for the vulnerability",
+    "severity_critical": "Vulnerability has critical severity",
+    "severity_high": "Vulnerability has high severity",
+    "severity_medium": "Vulnerability has medium severity",
+    "severity_low": "Vulnerability has low severity",
+    "business_impact_critical": "Vulnerability has critical business impact",
+    "business_impact_high": "Vulnerability has high business impact",
+    "business_impact_medium": "Vulnerability has medium business impact",
+    "business_impact_low": "Vulnerability has low business impact",
+    "system_exposure_internet-facing": "Affected system is exposed to the internet",
+    "system_exposure_internal": "Affected system is internal",
+    "system_exposure_isolated": "Affected system is isolated",
+}
 
-def predict_vulnerability_priority(
-    db: Session,
-    vulnerability_data: Dict[str, Any],
-) -> Optional[Dict[str, Any]]:
-    """
-    Make a prediction for a single vulnerability using the trained model.
-    
-    Args:
-        db: Database session
-        vulnerability_data: Dictionary with vulnerability data
-        
-    Returns:
-        Dictionary with prediction results
-    """
-    model = load_model()
-    if not model:
-        return None
-    
-    metadata = load_model_metadata()
-    
-    try:
-        # Convert to DataFrame
-        data = pd.DataFrame([vulnerability_data])
-        
-        # Preprocess data
-        data_processed, _ = preprocess_data(data)
-        
-        # Get feature names from metadata
-        feature_names = metadata.get("feature_names", [])
-        if not feature_names:
-            logger.error("No feature names found in metadata")
-            return None
-        
-        # Select features
-        X = data_processed[feature_names]
-        
-        # Make prediction
-        priority_score = float(model.predict_proba(X)[0, 1])
-        priority_class = get_priority_class(priority_score)
-        
-        # Get feature contributions
-        feature_contributions = {}
-        if hasattr(model, "feature_importances_"):
-            importances = model.feature_importances_
-            for name, importance in zip(feature_names, importances):
-                feature_value = X[name].values[0]
-                contribution = float(importance * feature_value)
-                feature_contributions[name] = contribution
-        
-        # Generate explanation
-        explanation = generate_explanation(priority_score, feature_contributions, vulnerability_data)
-        
-        # Generate recommended action
-        recommended_action = generate_recommended_action(priority_score, vulnerability_data)
-        
-        return {
-            "vulnerability_id": vulnerability_data.get("id"),
-            "priority_score": priority_score,
-            "priority_class": priority_class,
-            "confidence": get_confidence(priority_score),
-            "feature_contributions": feature_contributions,
-            "explanation": explanation,
-            "recommended_action": recommended_action,
-        }
-    
-    except Exception as e:
-        logger.error(f"Error predicting vulnerability priority: {e}", exc_info=True)
-        return None
 
+def get_feature_description(feature_name: str) -> str:
+    """Get description for a feature."""
+    return _FEATURE_DESCRIPTIONS.get(feature_name, "")
 
-def get_model_metadata(db: Session) -> Optional[Dict[str, Any]]:
+
+def _explanation_rule(feature: str) -> Optional[Tuple[int, str, bool]]:
     """
-    Get metadata about the current ML model.
+    Resolve how a feature is described in prediction explanations.
     
     Args:
-        db: Database session
+        feature: Feature name
         
     Returns:
-        Dictionary with model metadata
+        Tuple of the contribution sign that gets the feature mentioned, the phrase,
+        and whether the phrase takes the CVSS score; None if the feature is never mentioned
     """
-    return load_model_metadata()
-
+    if "cvss_score" in feature:
+        return 1, "high CVSS score ({cvss_score})", True
+    if "exploit_available" in feature:
+        return 1, "publicly available exploit", False
+    if "patch_available" in feature:
+        return -1, "available patch", False
+    if "severity" in feature:
+        return 1, f"{feature.split('_')[1]} severity", False
+    if "business_impact" in feature:
+        return 1, f"{feature.split('_')[2]} business impact", False
+    if "system_exposure" in feature:
+        return 1, f"{feature.split('_')[2]} system exposure", False
+    return None
 
-# Helper functions
 
-def get_feature_description(feature_name: str) -> str:
-    """Get description for a feature."""
-    descriptions = {
-        "cvss_score": "CVSS score indicating the severity of the vulnerability",
-        "exploit_available": "Whether an exploit is publicly available",
-        "patch_available": "Whether a patch is available for the vulnerability",
-        "severity_critical": "Vulnerability has critical severity",
-        "severity_high": "Vulnerability has high severity",
-        "severity_medium": "Vulnerability has medium severity",
-        "severity_low": "Vulnerability has low severity",
-        "business_impact_critical": "Vulnerability has critical business impact",
-        "business_impact_high": "Vulnerability has high business impact",
-        "business_impact_medium": "Vulnerability has medium business impact",
-        "business_impact_low": "Vulnerability has low business impact",
-        "system_exposure_internet-facing": "Affected system is exposed to the internet",
-        "system_exposure_internal": "Affected system is internal",
-        "system_exposure_isolated": "Affected system is isolated",
-    }
-    return descriptions.get(feature_name, "")
+# Explanation rule per feature name, resolved once; other names are added on first use
+_EXPLANATION_RULES = {
+    name: _explanation_rule(name) for name in (*_FEATURE_NAMES, *_FEATURE_DESCRIPTIONS)
+}
 
 
 def get_priority_class(score: float) -> str:
@@ -447,18 +199,19 @@ def get_confidence(score: float) -> float:
 
 def generate_explanation(
     priority_score: float,
-    feature_contributions: Dict[str, float],
+    feature_names: Sequence[str],
+    contributions: np.ndarray,
     vulnerability_data: Dict[str, Any],
 ) -> str:
-    """Generate human-readable explanation for the prediction."""
+    """Generate human-readable explanation for the prediction from per-feature contributions."""
     priority_class = get_priority_class(priority_score)
     
-    # Sort features by contribution
-    sorted_features = sorted(
-        feature_contributions.items(),
-        key=lambda x: abs(x[1]),
-        reverse=True
-    )[:3]  # Top 3 features
+    # Top 3 features by absolute contribution, largest first
+    magnitudes = np.abs(contributions)
+    top = min(3, len(magnitudes))
+    top_idx = np.argpartition(-magnitudes, top - 1)[:top] if top else np.empty(0, dtype=np.intp)
+    top_idx = top_idx[np.argsort(-magnitudes[top_idx], kind="stable")]
+    sorted_features = [(feature_names[i], float(contributions[i])) for i in top_idx.tolist()]
     
     explanation = f"This vulnerability has been classified as {priority_class} priority "
     explanation += f"with a score of {priority_score:.2f}. "
@@ -468,21 +221,17 @@ def generate_explanation(
         feature_explanations = []
         
         for feature, contribution in sorted_features:
-            if "cvss_score" in feature and contribution > 0:
-                feature_explanations.append(f"high CVSS score ({vulnerability_data.get('cvss_score', 'N/A')})")
-            elif "exploit_available" in feature and contribution > 0:
-                feature_explanations.append("publicly available exploit")
-            elif "patch_available" in feature and contribution < 0:
-                feature_explanations.append("available patch")
-            elif "severity" in feature and contribution > 0:
-                severity = feature.split("_")[1]
-                feature_explanations.append(f"{severity} severity")
-            elif "business_impact" in feature and contribution > 0:
-                impact = feature.split("_")[2]
-                feature_explanations.append(f"{impact} business impact")
-            elif "system_exposure" in feature and contribution > 0:
-                exposure = feature.split("_")[2]
-                feature_explanations.append(f"{exposure} system exposure")
+            if feature not in _EXPLANATION_RULES:
+                _EXPLANATION_RULES[feature] = _explanation_rule(feature)
+            rule = _EXPLANATION_RULES[feature]
+            if rule is None:
+                continue
+            
+            sign, phrase, uses_cvss = rule
+            if contribution * sign > 0:
+                if uses_cvss:
+                    phrase = phrase.format(cvss_score=vulnerability_data.get("cvss_score", "N/A"))
+                feature_explanations.append(phrase)
         
         explanation += ", ".join(feature_explanations)
     
@@ -517,6 +266,8 @@ def create_model(db: Session, model: MLModelCreate) -> MLModel:
     Returns:
         Created model
     """
+    # Creation and last update are the same instant, read once
+    now = datetime.now()
     db_model = MLModel(
         name=model.name,
         description=model.description,
@@ -525,8 +276,8 @@ def create_model(db: Session, model: MLModelCreate) -> MLModel:
         hyperparameters=model.hyperparameters,
         metrics={},
         status="created",
-        created_at=datetime.now(),
-        updated_at=datetime.now(),
+        created_at=now,
+        updated_at=now,
     )
     db.add(db_model)
     db.commit()
@@ -554,15 +305,17 @@ def get_models(
     skip: int = 0,
     limit: int = 100,
     filters: Optional[Dict[str, Any]] = None,
+    after_id: Optional[int] = None,
 ) -> List[MLModel]:
     """
     Get ML models with optional filtering.
     
     Args:
         db: Database session
-        skip: Number of records to skip
+        skip: Number of records to skip (ignored when after_id is given)
         limit: Maximum number of records to return
         filters: Optional filters
+        after_id: Only return records with an ID greater than this (keyset pagination)
         
     Returns:
         List of models
@@ -575,7 +328,13 @@ def get_models(
         if "status" in filters:
             query = query.filter(MLModel.status == filters["status"])
     
-    return query.offset(skip).limit(limit).all()
+    query = query.order_by(MLModel.id)
+    if after_id is not None:
+        query = query.filter(MLModel.id > after_id)
+    else:
+        query = query.offset(skip)
+    
+    return query.limit(limit).all()
 
 
 def update_model(db: Session, model_id: int, model: MLModelUpdate) -> Optional[MLModel]:
@@ -605,6 +364,30 @@ def update_model(db: Session, model_id: int, model: MLModelUpdate) -> Optional[M
     return db_model
 
 
+def set_model_status(db: Session, model_id: int, status: str) -> Optional[MLModel]:
+    """
+    Set the status of an ML model with a single UPDATE ... RETURNING statement.
+    
+    Args:
+        db: Database session
+        model_id: ID of the model to update
+        status: New status
+        
+    Returns:
+        Updated model if found, None otherwise
+    """
+    db_model = db.scalars(
+        update(MLModel)
+        .where(MLModel.id == model_id)
+        .values(status=status, updated_at=func.now())
+        .returning(MLModel)
+    ).first()
+    db.commit()
+    if db_model:
+        logger.info(f"Set status of ML model with ID {model_id} to {status}")
+    return db_model
+
+
 def delete_model(db: Session, model_id: int) -> bool:
     """
     Delete an ML model.
@@ -626,59 +409,130 @@ def delete_model(db: Session, model_id: int) -> bool:
     return True
 
 
-def _get_vulnerability_features(vulnerability_data: Dict[str, Any]) -> Dict[str, Any]:
+@lru_cache(maxsize=16)
+def _feature_layout(
+    feature_names: Tuple[str, ...],
+) -> Tuple[Optional[int], List[Tuple[str, int]], List[Tuple[str, str, Dict[str, int]]]]:
     """
-    Extract features from vulnerability data.
+    Work out where each vulnerability field goes in a feature matrix, once per feature list.
     
     Args:
-        vulnerability_data: Vulnerability data
+        feature_names: Columns of the matrix, in order
+        
+    Returns:
+        Tuple of the cvss_score column (None if absent), (field, column) pairs for
+        the boolean flags, and (field, default, {category: column}) for the one-hot
+        encoded fields
+    """
+    columns = {name: i for i, name in enumerate(feature_names)}
+    cvss_col = columns.get("cvss_score")
+    flag_cols = [
+        (field, columns[field]) for field in ("exploit_available", "patch_available") if field in columns
+    ]
+    # Each field's one-hot columns keyed by category, taken from the feature names
+    # so models trained on other category sets line up too
+    category_cols = []
+    for field, default, _ in _CATEGORICAL_FEATURES:
+        prefix = f"{field}_"
+        category_cols.append((
+            field,
+            default,
+            {name[len(prefix):]: col for name, col in columns.items() if name.startswith(prefix)},
+        ))
+    
+    return cvss_col, flag_cols, category_cols
+
+
+def _build_feature_matrix(
+    records: Sequence[Mapping[str, Any]],
+    feature_names: Sequence[str] = _FEATURE_NAMES,
+) -> np.ndarray:
+    """
+    Encode vulnerabilities straight into a float32 feature matrix.
+    
+    Each feature is gathered from the records with one Python pass and written
+    into its column of a preallocated matrix with a single vectorized assignment;
+    no per-record vector, per-cell write or intermediate DataFrame is involved.
+    
+    Args:
+        records: Vulnerability data
+        feature_names: Columns of the matrix, in order; names the records don't
+            produce are left as 0
+        
+    Returns:
+        Feature matrix of shape (len(records), len(feature_names))
+    """
+    cvss_col, flag_cols, category_cols = _feature_layout(tuple(feature_names))
+    
+    out = np.zeros((len(records), len(feature_names)), dtype=np.float32)
+    if cvss_col is not None:
+        # Missing scores (absent or None) become NaN, which the model handles natively
+        out[:, cvss_col] = np.array(
+            [record.get("cvss_score") for record in records], dtype=np.float32
+        )
+    for field, col in flag_cols:
+        out[:, col] = [bool(record.get(field)) for record in records]
+    for field, default, cols in category_cols:
+        if not cols:
+            continue
+        # One-hot column per record, -1 for categories the model has no column for
+        hit_cols = np.array(
+            [cols.get((record.get(field) or default).lower(), -1) for record in records],
+            dtype=np.intp,
+        )
+        hit_rows = np.flatnonzero(hit_cols >= 0)
+        out[hit_rows, hit_cols[hit_rows]] = 1
+    
+    return out
+
+
+def _build_feature_matrix_from_frame(
+    data: pd.DataFrame,
+    feature_names: Sequence[str] = _FEATURE_NAMES,
+) -> np.ndarray:
+    """
+    Encode a DataFrame of vulnerabilities into a float32 feature matrix.
+    
+    Produces the same matrix as ``_build_feature_matrix`` for the same records, but
+    each feature is encoded with vectorized column operations, which pays off for
+    table-sized inputs.
+    
+    Args:
+        data: Vulnerability data, one column per field
+        feature_names: Columns of the matrix, in order; names the data doesn't
+            produce are left as 0
         
     Returns:
-        Features dictionary
-    """
-    # Extract features from vulnerability data
-    features = {
-        "cvss_score": vulnerability_data.get("cvss_score", 0.0),
-        "exploit_available": int(vulnerability_data.get("exploit_available", False)),
-        "patch_available": int(vulnerability_data.get("patch_available", False)),
-    }
-    
-    # Add severity as one-hot encoded features
-    severity = vulnerability_data.get("severity", "low").lower()
-    features["severity_critical"] = int(severity == "critical")
-    features["severity_high"] = int(severity == "high")
-    features["severity_medium"] = int(severity == "medium")
-    features["severity_low"] = int(severity == "low")
-    
-    # Add exploit maturity as one-hot encoded features
-    exploit_maturity = vulnerability_data.get("exploit_maturity", "").lower()
-    features["exploit_maturity_high"] = int(exploit_maturity == "high")
-    features["exploit_maturity_functional"] = int(exploit_maturity == "functional")
-    features["exploit_maturity_poc"] = int(exploit_maturity == "poc")
-    features["exploit_maturity_unproven"] = int(exploit_maturity == "unproven")
-    
-    # Add business impact as one-hot encoded features
-    business_impact = vulnerability_data.get("business_impact", "").lower()
-    features["business_impact_critical"] = int(business_impact == "critical")
-    features["business_impact_high"] = int(business_impact == "high")
-    features["business_impact_medium"] = int(business_impact == "medium")
-    features["business_impact_low"] = int(business_impact == "low")
-    
-    # Add data classification as one-hot encoded features
-    data_classification = vulnerability_data.get("data_classification", "").lower()
-    features["data_classification_restricted"] = int(data_classification == "restricted")
-    features["data_classification_confidential"] = int(data_classification == "confidential")
-    features["data_classification_internal"] = int(data_classification == "internal")
-    features["data_classification_public"] = int(data_classification == "public")
-    
-    # Add system exposure as one-hot encoded features
-    system_exposure = vulnerability_data.get("system_exposure", "").lower()
-    features["system_exposure_internet"] = int(system_exposure == "internet")
-    features["system_exposure_intranet"] = int(system_exposure == "intranet")
-    features["system_exposure_internal"] = int(system_exposure == "internal")
-    features["system_exposure_isolated"] = int(system_exposure == "isolated")
-    
-    return features
+        Feature matrix of shape (len(data), len(feature_names))
+    """
+    cvss_col, flag_cols, category_cols = _feature_layout(tuple(feature_names))
+    
+    out = np.zeros((len(data), len(feature_names)), dtype=np.float32)
+    if cvss_col is not None:
+        # Missing scores become NaN, which the model handles natively
+        if "cvss_score" in data:
+            out[:, cvss_col] = data["cvss_score"].to_numpy(dtype=np.float32, na_value=np.nan)
+        else:
+            out[:, cvss_col] = np.nan
+    for field, col in flag_cols:
+        if field in data:
+            out[:, col] = data[field].fillna(False).to_numpy(dtype=bool)
+    for field, default, cols in category_cols:
+        if not cols:
+            continue
+        if field not in data:
+            col = cols.get(default)
+            if col is not None:
+                out[:, col] = 1
+            continue
+        # Empty and missing values take the field's default, as in _build_feature_matrix
+        values = data[field].fillna("")
+        values = values.mask(values == "", default).str.lower()
+        hit_cols = values.map(cols).fillna(-1).to_numpy(dtype=np.intp)
+        hit_rows = np.flatnonzero(hit_cols >= 0)
+        out[hit_rows, hit_cols[hit_rows]] = 1
+    
+    return out
 
 
 def _get_latest_model(db: Session, model_id: Optional[int] = None) -> Optional[MLModel]:
@@ -692,25 +546,103 @@ def _get_latest_model(db: Session, model_id: Optional[int] = None) -> Optional[M
     Returns:
         Latest trained model if found, None otherwise
     """
+    # Prediction needs identifying fields and the feature importances, not the other JSON details
+    query = (
+        db.query(MLModel)
+        .options(
+            load_only(
+                MLModel.id,
+                MLModel.name,
+                MLModel.version,
+                MLModel.status,
+                MLModel.feature_importance,
+                MLModel.updated_at,
+            )
+        )
+        .filter(MLModel.status == "trained")
+        .filter(MLModel.blob.has())
+    )
+    
     if model_id:
-        model = get_model(db, model_id)
-        if model and model.status == "trained" and model.model_data:
+        model = query.filter(MLModel.id == model_id).first()
+        if model:
             return model
     
     # Get the latest trained model
-    models = (
-        db.query(MLModel)
-        .filter(MLModel.status == "trained")
-        .filter(MLModel.model_data.isnot(None))
-        .order_by(MLModel.updated_at.desc())
-        .limit(1)
-        .all()
-    )
+    return query.order_by(MLModel.updated_at.desc()).first()
+
+
+def _get_model_blob(db: Session, model_id: int) -> Optional[bytes]:
+    """
+    Get the serialized estimator of a model.
     
-    if models:
-        return models[0]
+    Args:
+        db: Database session
+        model_id: ID of the model
+        
+    Returns:
+        Serialized estimator if the model has been trained, None otherwise
+    """
+    return db.query(MLModelBlob.data).filter(MLModelBlob.model_id == model_id).scalar()
+
+
+def _serialize_model(model: Any) -> bytes:
+    """
+    Serialize an estimator for storage, zlib-compressed with pickle protocol 5.
     
-    return None
+    Args:
+        model: Fitted estimator
+        
+    Returns:
+        Serialized estimator
+    """
+    buffer = io.BytesIO()
+    joblib.dump(model, buffer, compress=3, protocol=5)
+    return buffer.getvalue()
+
+
+def _load_estimator(db: Session, db_model: MLModel) -> Any:
+    """
+    Get the deserialized estimator of a stored model, reusing it until the model changes.
+    
+    Args:
+        db: Database session
+        db_model: Trained model, with id and updated_at loaded
+        
+    Returns:
+        Fitted estimator
+    """
+    key = (db_model.id, db_model.updated_at)
+    with _estimator_cache_lock:
+        estimator = _estimator_cache.get(key)
+    if estimator is not None:
+        return estimator
+    
+    with _estimator_load_lock:
+        # Another request may have loaded it while this one waited
+        with _estimator_cache_lock:
+            estimator = _estimator_cache.get(key)
+        if estimator is not None:
+            return estimator
+        
+        # joblib also reads blobs stored as plain pickles
+        estimator = joblib.load(io.BytesIO(_get_model_blob(db, db_model.id)))
+        with _estimator_cache_lock:
+            _estimator_cache[key] = estimator
+    return estimator
+
+
+def _save_model_blob(db: Session, model_id: int, data: bytes) -> None:
+    """
+    Replace the serialized estimator of a model. The caller commits.
+    
+    Args:
+        db: Database session
+        model_id: ID of the model
+        data: Serialized estimator
+    """
+    db.query(MLModelBlob).filter(MLModelBlob.model_id == model_id).delete(synchronize_session=False)
+    db.add(MLModelBlob(model_id=model_id, data=data))
 
 
 def train_model(db: Session, model_id: int, params: Dict[str, Any]) -> Optional[MLModel]:
@@ -725,21 +657,17 @@ def train_model(db: Session, model_id: int, params: Dict[str, Any]) -> Optional[
     Returns:
         Trained model if successful, None otherwise
     """
-    db_model = get_model(db, model_id)
+    # Update model status to training
+    db_model = set_model_status(db, model_id, "training")
     if not db_model:
         logger.error(f"Model with ID {model_id} not found")
         return None
     
     try:
-        # Update model status to training
-        db_model.status = "training"
-        db_model.updated_at = datetime.now()
-        db.commit()
-        db.refresh(db_model)
-        
         # Get training data
         # In a real implementation, this would fetch data from the database
         # For this example, we'll generate synthetic data
+        # Single precision is plenty for tree splits and halves the data to bin
         X, y = _generate_synthetic_training_data()
         
         # Split data into train and test sets
@@ -749,40 +677,42 @@ def train_model(db: Session, model_id: int, params: Dict[str, Any]) -> Optional[
         hyperparameters = db_model.hyperparameters or {}
         hyperparameters.update(params.get("hyperparameters", {}))
         
-        # Train model
-        model = GradientBoostingClassifier(
-            n_estimators=hyperparameters.get("n_estimators", 100),
-            learning_rate=hyperparameters.get("learning_rate", 0.1),
-            max_depth=hyperparameters.get("max_depth", 3),
-            random_state=42,
+        # Train model, or one model per candidate of an optional "param_grid" sweep
+        # keeping the best R^2. The fits release the GIL, so threads run them in parallel.
+        candidates = [
+            {**hyperparameters, **overrides} for overrides in params.get("param_grid") or [{}]
+        ]
+        fitted = Parallel(n_jobs=min(len(candidates), os.cpu_count() or 1), prefer="threads")(
+            delayed(_fit_regressor)(candidate, X_train, y_train, X_test, y_test)
+            for candidate in candidates
         )
-        model.fit(X_train, y_train)
+        best = max(range(len(fitted)), key=lambda i: fitted[i][1])
+        model, r2, y_pred = fitted[best]
+        hyperparameters = candidates[best]
         
-        # Evaluate model
-        y_pred = model.predict(X_test)
+        # Evaluate model, reusing the R^2 computed while picking the candidate
         metrics = {
-            "accuracy": float(accuracy_score(y_test, y_pred)),
-            "precision": float(precision_score(y_test, y_pred, average="weighted")),
-            "recall": float(recall_score(y_test, y_pred, average="weighted")),
-            "f1": float(f1_score(y_test, y_pred, average="weighted")),
+            "r2": float(r2),
+            "mean_squared_error": float(mean_squared_error(y_test, y_pred)),
+            "mean_absolute_error": float(mean_absolute_error(y_test, y_pred)),
         }
         
         # Get feature importance
         feature_importance = []
-        for i, importance in enumerate(model.feature_importances_):
+        for name, importance in zip(_FEATURE_NAMES, _permutation_importances(model, X_test, y_test)):
             feature_importance.append({
-                "feature": f"feature_{i}",
+                "feature": name,
                 "importance": float(importance),
             })
         
         # Serialize model
-        model_data = pickle.dumps(model)
+        model_data = _serialize_model(model)
         
         # Update model
         db_model.hyperparameters = hyperparameters
         db_model.metrics = metrics
         db_model.feature_importance = feature_importance
-        db_model.model_data = model_data
+        _save_model_blob(db, db_model.id, model_data)
         db_model.status = "trained"
         db_model.updated_at = datetime.now()
         db.commit()
@@ -795,62 +725,115 @@ def train_model(db: Session, model_id: int, params: Dict[str, Any]) -> Optional[
         logger.error(f"Error training model with ID {model_id}: {str(e)}")
         
         # Update model status to error
-        db_model.status = "error"
-        db_model.updated_at = datetime.now()
-        db.commit()
-        db.refresh(db_model)
+        db.rollback()
+        set_model_status(db, model_id, "error")
         
         return None
 
 
-def _generate_synthetic_training_data() -> Tuple[np.ndarray, np.ndarray]:
+def _fit_regressor(
+    hyperparameters: Dict[str, Any],
+    X_train: np.ndarray,
+    y_train: np.ndarray,
+    X_test: np.ndarray,
+    y_test: np.ndarray,
+) -> Tuple[HistGradientBoostingRegressor, float, np.ndarray]:
     """
-    Generate synthetic training data.
+    Fit a priority score regressor with the given hyperparameters and score it on the test split.
     
+    Args:
+        hyperparameters: Model hyperparameters
+        X_train: Training features
+        y_train: Training priority scores
+        X_test: Test features
+        y_test: Test priority scores
+        
     Returns:
-        Tuple of features and labels
+        Tuple of the fitted model, its test R^2 and its test predictions
     """
-    # Generate synthetic data
-    np.random.seed(42)
-    n_samples = 1000
-    n_features = 25
-    
-    # Generate features
-    X = np.random.rand(n_samples, n_features)
-    
-    # Generate labels (priority scores from 0 to 10)
-    y = np.zeros(n_samples)
-    
-    # CVSS score has high impact on priority
-    cvss_score = X[:, 0] * 10  # Scale to 0-10
-    
-    # Exploit availability has high impact
-    exploit_available = (X[:, 1] > 0.7).astype(int)
-    
-    # Patch availability has medium impact (inverse relationship)
-    patch_available = (X[:, 2] > 0.5).astype(int)
+    # Features are binned once per fit (max_bins values, at most 255, stored as
+    # uint8) and every boosting iteration builds its histograms from those bins.
+    # Early stopping holds out part of the training data, so it is opt-in: off
+    # unless the "early_stopping" hyperparameter enables it.
+    model = HistGradientBoostingRegressor(
+        max_iter=hyperparameters.get("max_iter", hyperparameters.get("n_estimators", 100)),
+        learning_rate=hyperparameters.get("learning_rate", 0.1),
+        max_depth=hyperparameters.get("max_depth", 3),
+        max_bins=hyperparameters.get("max_bins", 255),
+        early_stopping=hyperparameters.get("early_stopping", False),
+        random_state=42,
+    )
+    model.fit(X_train, y_train)
+    y_pred = model.predict(X_test)
+    return model, r2_score(y_test, y_pred), y_pred
+
+
+def _permutation_importances(model: Any, X: Any, y: Any) -> np.ndarray:
+    """
+    Rank features by permutation importance on held-out data.
     
-    # Severity has high impact
-    severity_critical = (X[:, 3] > 0.8).astype(int)
-    severity_high = ((X[:, 3] > 0.6) & (X[:, 3] <= 0.8)).astype(int)
+    HistGradientBoostingRegressor has no impurity-based ``feature_importances_``.
     
-    # Business impact has medium impact
-    business_impact_critical = (X[:, 4] > 0.8).astype(int)
-    business_impact_high = ((X[:, 4] > 0.6) & (X[:, 4] <= 0.8)).astype(int)
+    Args:
+        model: Fitted estimator
+        X: Held-out features
+        y: Held-out labels
+        
+    Returns:
+        Mean importance of each feature
+    """
+    result = permutation_importance(model, X, y, n_repeats=5, random_state=42, n_jobs=-1)
+    return result.importances_mean
+
+
+def _generate_synthetic_training_data() -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Generate synthetic training data in the feature layout of ``_build_feature_matrix``.
     
-    # Calculate priority score
-    y = (
-        cvss_score * 0.4 +  # 40% weight
-        exploit_available * 2.0 +  # +2 if exploit available
-        (1 - patch_available) * 1.5 +  # +1.5 if no patch
-        severity_critical * 2.5 +  # +2.5 if critical
-        severity_high * 1.5 +  # +1.5 if high
-        business_impact_critical * 2.0 +  # +2 if critical business impact
-        business_impact_high * 1.0  # +1 if high business impact
-    )
+    Returns:
+        Tuple of features and labels
+    """
+    # Generate synthetic data from a local generator, leaving NumPy's global state alone
+    rng = np.random.default_rng(42)
+    n_samples = 1000
+    rows = np.arange(n_samples)
+    
+    # Build the features directly in single precision, in the columns prediction encodes
+    X = np.zeros((n_samples, len(_FEATURE_NAMES)), dtype=np.float32)
+    cvss_score = rng.random(n_samples, dtype=np.float32) * 10
+    exploit_available = rng.random(n_samples) > 0.7
+    patch_available = rng.random(n_samples) > 0.5
+    X[:, 0] = cvss_score
+    X[:, 1] = exploit_available
+    X[:, 2] = patch_available
+    
+    # One category per one-hot encoded field; codes index each field's categories
+    codes = {}
+    col = 3
+    for field, _, categories in _CATEGORICAL_FEATURES:
+        codes[field] = rng.integers(len(categories), size=n_samples)
+        X[rows, col + codes[field]] = 1
+        col += len(categories)
+    
+    # Generate labels (priority scores from 0 to 10), accumulated in place into one
+    # array instead of allocating a temporary per term.
+    # CVSS score has high impact on priority: 40% weight
+    y = cvss_score * 0.4
+    
+    # Exploit availability has high impact: +2 if exploit available
+    y += exploit_available * 2.0
+    
+    # Patch availability has medium impact (inverse relationship): +1.5 if no patch
+    y += ~patch_available * 1.5
+    
+    # Severity has high impact: +2.5 if critical, +1.5 if high
+    y += np.array([2.5, 1.5, 0.0, 0.0], dtype=np.float32)[codes["severity"]]
+    
+    # Business impact has medium impact: +2 if critical, +1 if high
+    y += np.array([2.0, 1.0, 0.0, 0.0], dtype=np.float32)[codes["business_impact"]]
     
     # Normalize to 0-10 range
-    y = np.clip(y, 0, 10)
+    np.clip(y, 0, 10, out=y)
     
     return X, y
 
@@ -869,48 +852,222 @@ def predict_vulnerability_priority(
     Returns:
         Prediction result
     """
+    return predict_many(db, [vulnerability_data], model_id)[0]
+
+
+def _encode_vulnerabilities(
+    vulnerabilities: Union[Sequence[Mapping[str, Any]], pd.DataFrame],
+) -> np.ndarray:
+    """
+    Encode vulnerabilities into the feature matrix the models are trained on.
+    
+    Args:
+        vulnerabilities: Vulnerability data, either one mapping per vulnerability or
+            a DataFrame with one column per field
+        
+    Returns:
+        Feature matrix with one row per vulnerability
+        
+    Raises:
+        ValueError: If the data cannot be encoded
+    """
+    try:
+        if isinstance(vulnerabilities, pd.DataFrame):
+            return _build_feature_matrix_from_frame(vulnerabilities)
+        return _build_feature_matrix(vulnerabilities)
+    except Exception as e:
+        logger.error(f"Error encoding vulnerability data: {str(e)}")
+        raise ValueError(f"Error predicting vulnerability priority: {str(e)}")
+
+
+def _predict_matrix(db: Session, X: np.ndarray, model_id: Optional[int] = None) -> List[MLPrediction]:
+    """
+    Score an encoded feature matrix with a single model call.
+    
+    Args:
+        db: Database session
+        X: Feature matrix built by ``_encode_vulnerabilities``
+        model_id: Optional model ID
+        
+    Returns:
+        Prediction results, one per row of X
+        
+    Raises:
+        ValueError: If there is no trained model or the model could not be applied
+    """
     # Get the latest trained model
     db_model = _get_latest_model(db, model_id)
     if not db_model:
         raise ValueError("No trained model found")
     
+    if len(X) == 0:
+        return []
+    
     try:
-        # Extract features
-        features = _get_vulnerability_features(vulnerability_data)
-        
-        # Convert features to numpy array
-        feature_names = list(features.keys())
-        X = np.array([features[name] for name in feature_names]).reshape(1, -1)
-        
         # Load model
-        model = pickle.loads(db_model.model_data)
+        model = _load_estimator(db, db_model)
         
-        # Make prediction
-        priority_score = float(model.predict(X)[0])
+        # Make predictions
+        priority_scores = np.asarray(model.predict(X), dtype=np.float64).tolist()
         
-        # Get feature importance for this prediction
+        # Feature importance is per model, so every prediction shares it
         explanation = {}
-        if hasattr(model, "feature_importances_"):
-            for i, name in enumerate(feature_names):
-                explanation[name] = float(model.feature_importances_[i])
-        
-        # Create prediction result
-        prediction = MLPrediction(
-            priority_score=priority_score,
-            model_id=db_model.id,
-            model_name=db_model.name,
-            model_version=db_model.version,
-            explanation=explanation,
-            timestamp=datetime.now(),
-        )
-        
-        return prediction
+        for name, item in zip(_FEATURE_NAMES, db_model.feature_importance or []):
+            explanation[name] = float(item["importance"])
+        
+        # Create prediction results
+        timestamp = datetime.now()
+        return [
+            MLPrediction(
+                priority_score=priority_score,
+                model_id=db_model.id,
+                model_name=db_model.name,
+                model_version=db_model.version,
+                explanation=explanation,
+                timestamp=timestamp,
+            )
+            for priority_score in priority_scores
+        ]
     
     except Exception as e:
         logger.error(f"Error predicting vulnerability priority: {str(e)}")
         raise ValueError(f"Error predicting vulnerability priority: {str(e)}")
 
 
+def predict_many(
+    db: Session,
+    vulnerabilities: Union[Sequence[Mapping[str, Any]], pd.DataFrame],
+    model_id: Optional[int] = None,
+) -> List[MLPrediction]:
+    """
+    Predict the priority of many vulnerabilities with a single model call.
+    
+    Args:
+        db: Database session
+        vulnerabilities: Vulnerability data, either one mapping per vulnerability or
+            a DataFrame with one column per field (e.g. built from a NumPy
+            structured array), which is encoded column-wise without per-row work
+        model_id: Optional model ID
+        
+    Returns:
+        Prediction results, in the order of the input
+    """
+    return _predict_matrix(db, _encode_vulnerabilities(vulnerabilities), model_id)
+
+
+def _hand_off_batch(items: List[Tuple[np.ndarray, asyncio.Future]]) -> None:
+    """Pass the still-waiting requests of a batch to the first of them, which scores them."""
+    waiting = [(row, waiter) for row, waiter in items if not waiter.done()]
+    if waiting:
+        waiting[0][1].set_result(waiting)
+
+
+async def _score_prediction_batch(
+    db: AsyncSession, model_id: Optional[int], items: List[Tuple[np.ndarray, asyncio.Future]]
+) -> MLPrediction:
+    """
+    Score a closed batch on this request's session and hand the other requests their results.
+    
+    Args:
+        db: Database session of the request scoring the batch, which is ``items[0]``
+        model_id: Optional model ID
+        items: Encoded rows of the batch with the futures of their requests
+        
+    Returns:
+        Prediction result of ``items[0]``
+    """
+    try:
+        predictions = await db.run_sync(
+            _predict_matrix, X=np.vstack([row for row, _ in items]), model_id=model_id
+        )
+    except Exception as e:
+        # The rows were validated when they joined, so what is left (no trained
+        # model, an estimator that won't load) applies to every request alike
+        for _, waiter in items[1:]:
+            if not waiter.done():
+                waiter.set_exception(e)
+        raise
+    except BaseException:
+        # This request was cancelled; another one in the batch takes over
+        _hand_off_batch(items[1:])
+        raise
+    
+    for (_, waiter), prediction in zip(items[1:], predictions[1:]):
+        if not waiter.done():
+            waiter.set_result(prediction)
+    return predictions[0]
+
+
+async def predict_vulnerability_priority_batched(
+    db: AsyncSession, vulnerability_data: Dict[str, Any], model_id: Optional[int] = None
+) -> MLPrediction:
+    """
+    Predict vulnerability priority, scoring concurrent requests for the same model together.
+    
+    Each request's data is encoded before it joins a batch, so malformed input
+    only fails that request. The first request for a model opens a batch and waits
+    up to ``_BATCH_MAX_DELAY`` (or until ``_BATCH_MAX_SIZE`` requests have joined),
+    then scores the stacked rows with one model call on its session, handing every
+    other request its result. If that request is cancelled, the next waiting one
+    scores the batch instead.
+    
+    Args:
+        db: Database session
+        vulnerability_data: Vulnerability data
+        model_id: Optional model ID
+        
+    Returns:
+        Prediction result
+        
+    Raises:
+        ValueError: If the data cannot be encoded, there is no trained model or
+            the model could not be applied
+    """
+    row = _encode_vulnerabilities([vulnerability_data])
+    
+    future = asyncio.get_running_loop().create_future()
+    pending = _pending_predictions.get(model_id)
+    if pending is not None:
+        items, full = pending
+        items.append((row, future))
+        if len(items) >= _BATCH_MAX_SIZE:
+            del _pending_predictions[model_id]
+            full.set()
+        try:
+            result = await future
+        except BaseException:
+            # Cancelled after the batch was handed over but before resuming to score
+            # it; pass it on again so the other requests don't wait forever
+            if future.done() and not future.cancelled() and future.exception() is None:
+                handed_over = future.result()
+                if isinstance(handed_over, list):
+                    _hand_off_batch(handed_over[1:])
+            raise
+        if isinstance(result, list):
+            # The batch was handed over to this request
+            return await _score_prediction_batch(db, model_id, result)
+        return result
+    
+    items = [(row, future)]
+    full = asyncio.Event()
+    _pending_predictions[model_id] = (items, full)
+    try:
+        try:
+            await asyncio.wait_for(full.wait(), _BATCH_MAX_DELAY)
+        except asyncio.TimeoutError:
+            pass
+    except BaseException:
+        # Cancelled while collecting; another request in the batch takes over
+        _hand_off_batch(items[1:])
+        raise
+    finally:
+        # Close the batch to new requests
+        if _pending_predictions.get(model_id, (None,))[0] is items:
+            del _pending_predictions[model_id]
+    
+    return await _score_prediction_batch(db, model_id, items)
+
+
 def get_feature_importance(db: Session, model_id: int) -> Optional[List[MLFeatureImportance]]:
     """
     Get feature importance for an ML model.
@@ -920,14 +1077,14 @@ def get_feature_importance(db: Session, model_id: int) -> Optional[List[MLFeatur
         model_id: ID of the model
         
     Returns:
-        Feature importance if found, None otherwise
+        Feature importance (empty if the model has none) if the model exists, None otherwise
     """
-    db_model = get_model(db, model_id)
-    if not db_model or not db_model.feature_importance:
+    row = db.query(MLModel.feature_importance).filter(MLModel.id == model_id).first()
+    if row is None:
         return None
     
     feature_importance = []
-    for item in db_model.feature_importance:
+    for item in row.feature_importance or []:
         feature_importance.append(MLFeatureImportance(
             feature=item["feature"],
             importance=item["importance"],
@@ -1,15 +1,25 @@
 import logging
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from typing import AsyncIterator, Dict, List, Any, Optional
 
+from sqlalchemy import Select, delete, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.models.scan import Scan
 from app.models.vulnerability import Vulnerability
 from app.schemas.scan import ScanCreate, ScanUpdate
+from app.services.asset_service import invalidate_summary
 
 logger = logging.getLogger(__name__)
 
+# Columns that get_scans can filter on, by filter name
+_FILTER_COLS = {
+    "status": Scan.status,
+    "scanner_type": Scan.scanner_type,
+    "asset_id": Scan.asset_id,
+}
+
 
 def create_scan(db: Session, scan: ScanCreate) -> Scan:
     """
@@ -33,12 +43,10 @@ def create_scan(db: Session, scan: ScanCreate) -> Scan:
         scan_depth=scan.scan_depth,
         scanner_config=scan.scanner_config,
         status="pending",
-        created_at=datetime.now(),
-        updated_at=datetime.now(),
     )
     db.add(db_scan)
     db.commit()
-    db.refresh(db_scan)
+    invalidate_summary(db_scan.asset_id)
     logger.info(f"Created scan with ID {db_scan.id}")
     return db_scan
 
@@ -54,7 +62,21 @@ def get_scan(db: Session, scan_id: int) -> Optional[Scan]:
     Returns:
         Scan if found, None otherwise
     """
-    return db.query(Scan).filter(Scan.id == scan_id).first()
+    return db.get(Scan, scan_id)
+
+
+def get_scan_status(db: Session, scan_id: int) -> Optional[str]:
+    """
+    Get only the status of a scan.
+    
+    Args:
+        db: Database session
+        scan_id: ID of the scan
+        
+    Returns:
+        Scan status if found, None otherwise
+    """
+    return db.query(Scan.status).filter(Scan.id == scan_id).scalar()
 
 
 def get_scans(
@@ -62,30 +84,39 @@ def get_scans(
     skip: int = 0,
     limit: int = 100,
     filters: Optional[Dict[str, Any]] = None,
+    after_id: Optional[int] = None,
 ) -> List[Scan]:
     """
     Get scans with optional filtering.
     
     Args:
         db: Database session
-        skip: Number of records to skip
+        skip: Number of records to skip (ignored when after_id is given)
         limit: Maximum number of records to return
         filters: Optional filters
+        after_id: Only return records with an ID greater than this (keyset pagination)
         
     Returns:
         List of scans
     """
-    query = db.query(Scan)
-    
+    # Collect every condition first so the statement is filtered once; the same
+    # filter combination always produces the same statement shape, so its
+    # compiled SQL is reused from the engine's cache
+    clauses = []
     if filters:
-        if "status" in filters:
-            query = query.filter(Scan.status == filters["status"])
-        if "scanner_type" in filters:
-            query = query.filter(Scan.scanner_type == filters["scanner_type"])
-        if "asset_id" in filters:
-            query = query.filter(Scan.asset_id == filters["asset_id"])
+        clauses = [
+            column == filters[name]
+            for name, column in _FILTER_COLS.items()
+            if name in filters
+        ]
+    if after_id is not None:
+        clauses.append(Scan.id > after_id)
+    
+    stmt = select(Scan).where(*clauses).order_by(Scan.id)
+    if after_id is None:
+        stmt = stmt.offset(skip)
     
-    return query.offset(skip).limit(limit).all()
+    return list(db.scalars(stmt.limit(limit)))
 
 
 def update_scan(db: Session, scan_id: int, scan: ScanUpdate) -> Optional[Scan]:
@@ -103,14 +134,16 @@ def update_scan(db: Session, scan_id: int, scan: ScanUpdate) -> Optional[Scan]:
     db_scan = get_scan(db, scan_id)
     if not db_scan:
         return None
+    previous_asset_id = db_scan.asset_id
     
     # Update fields
     for field, value in scan.dict(exclude_unset=True).items():
         setattr(db_scan, field, value)
     
-    db_scan.updated_at = datetime.now()
+    # updated_at is set by its onupdate default when the UPDATE is flushed
     db.commit()
-    db.refresh(db_scan)
+    invalidate_summary(previous_asset_id)
+    invalidate_summary(db_scan.asset_id)
     logger.info(f"Updated scan with ID {db_scan.id}")
     return db_scan
 
@@ -126,12 +159,15 @@ def delete_scan(db: Session, scan_id: int) -> bool:
     Returns:
         True if deleted, False otherwise
     """
-    db_scan = get_scan(db, scan_id)
-    if not db_scan:
+    # Vulnerabilities go with it through ON DELETE CASCADE
+    deleted = db.execute(
+        delete(Scan).where(Scan.id == scan_id).returning(Scan.asset_id)
+    ).first()
+    db.commit()
+    if deleted is None:
         return False
     
-    db.delete(db_scan)
-    db.commit()
+    invalidate_summary(deleted.asset_id)
     logger.info(f"Deleted scan with ID {scan_id}")
     return True
 
@@ -147,15 +183,19 @@ def start_scan(db: Session, scan_id: int) -> Optional[Scan]:
     Returns:
         Updated scan if found, None otherwise
     """
-    db_scan = get_scan(db, scan_id)
-    if not db_scan:
+    # One UPDATE ... RETURNING instead of loading the scan first; updated_at is set
+    # by its onupdate default
+    db_scan = db.execute(
+        update(Scan)
+        .where(Scan.id == scan_id)
+        .values(status="running", started_at=datetime.now())
+        .returning(Scan)
+    ).scalar_one_or_none()
+    db.commit()
+    if db_scan is None:
         return None
     
-    db_scan.status = "running"
-    db_scan.started_at = datetime.now()
-    db_scan.updated_at = datetime.now()
-    db.commit()
-    db.refresh(db_scan)
+    invalidate_summary(db_scan.asset_id)
     logger.info(f"Started scan with ID {db_scan.id}")
     return db_scan
 
@@ -171,14 +211,15 @@ def stop_scan(db: Session, scan_id: int) -> Optional[Scan]:
     Returns:
         Updated scan if found, None otherwise
     """
-    db_scan = get_scan(db, scan_id)
-    if not db_scan:
+    # One UPDATE ... RETURNING instead of loading the scan first
+    db_scan = db.execute(
+        update(Scan).where(Scan.id == scan_id).values(status="stopped").returning(Scan)
+    ).scalar_one_or_none()
+    db.commit()
+    if db_scan is None:
         return None
     
-    db_scan.status = "stopped"
-    db_scan.updated_at = datetime.now()
-    db.commit()
-    db.refresh(db_scan)
+    invalidate_summary(db_scan.asset_id)
     logger.info(f"Stopped scan with ID {db_scan.id}")
     return db_scan
 
@@ -211,35 +252,99 @@ def update_scan_status(
     Returns:
         Updated scan if found, None otherwise
     """
-    db_scan = get_scan(db, scan_id)
-    if not db_scan:
-        return None
-    
-    db_scan.status = status
-    db_scan.updated_at = datetime.now()
-    
+    values = {"status": status}
     if status == "completed":
-        db_scan.completed_at = datetime.now()
+        values["completed_at"] = datetime.now()
     
-    if vulnerabilities_count is not None:
-        db_scan.vulnerabilities_count = vulnerabilities_count
+    counts = (
+        ("vulnerabilities_count", vulnerabilities_count),
+        ("critical_count", critical_count),
+        ("high_count", high_count),
+        ("medium_count", medium_count),
+        ("low_count", low_count),
+    )
+    values.update((name, count) for name, count in counts if count is not None)
     
-    if critical_count is not None:
-        db_scan.critical_count = critical_count
+    # One UPDATE ... RETURNING; updated_at is set by its onupdate default
+    db_scan = db.execute(
+        update(Scan).where(Scan.id == scan_id).values(**values).returning(Scan)
+    ).scalar_one_or_none()
+    db.commit()
+    if db_scan is None:
+        return None
     
-    if high_count is not None:
-        db_scan.high_count = high_count
+    invalidate_summary(db_scan.asset_id)
+    logger.info(f"Updated scan status to {status} for scan with ID {db_scan.id}")
+    return db_scan
+
+
+def get_scan_severity_counts(db: Session, scan_id: int) -> Dict[str, int]:
+    """
+    Count the vulnerabilities of a scan per severity in the database.
     
-    if medium_count is not None:
-        db_scan.medium_count = medium_count
+    Args:
+        db: Database session
+        scan_id: ID of the scan
+        
+    Returns:
+        Number of vulnerabilities by severity; severities without any are absent
+    """
+    rows = db.execute(
+        select(Vulnerability.severity, func.count())
+        .where(Vulnerability.scan_id == scan_id)
+        .group_by(Vulnerability.severity)
+    )
+    return dict(rows.tuples())
+
+
+def get_scan_result_summary(db: Session, scan_id: int) -> Optional[Dict[str, Any]]:
+    """
+    Get the summary part of a scan's results, without the vulnerability list.
     
-    if low_count is not None:
-        db_scan.low_count = low_count
+    Args:
+        db: Database session
+        scan_id: ID of the scan
+        
+    Returns:
+        Scan result summary if found, None otherwise
+    """
+    # Read the summary columns as a plain row, skipping the description and
+    # scanner_config payloads and the ORM entity the summary does not need
+    row = db.execute(
+        select(
+            Scan.id.label("scan_id"),
+            Scan.name.label("scan_name"),
+            Scan.status,
+            Scan.started_at,
+            Scan.completed_at,
+            Scan.vulnerabilities_count.label("total_vulnerabilities"),
+            Scan.critical_count,
+            Scan.high_count,
+            Scan.medium_count,
+            Scan.low_count,
+        ).where(Scan.id == scan_id)
+    ).mappings().first()
+    if row is None:
+        return None
     
-    db.commit()
-    db.refresh(db_scan)
-    logger.info(f"Updated scan status to {status} for scan with ID {db_scan.id}")
-    return db_scan
+    return dict(row)
+
+
+def _scan_vulnerability_summaries_query(scan_id: int) -> Select:
+    """Build the query selecting the vulnerability summaries of a scan."""
+    return (
+        select(
+            Vulnerability.id,
+            Vulnerability.title,
+            Vulnerability.severity,
+            Vulnerability.cvss_score,
+            Vulnerability.cve_id,
+            Vulnerability.status,
+            Vulnerability.priority.label("priority_score"),
+        )
+        .where(Vulnerability.scan_id == scan_id)
+        .order_by(Vulnerability.id)
+    )
 
 
 def get_scan_results(db: Session, scan_id: int) -> Optional[Dict[str, Any]]:
@@ -253,48 +358,90 @@ def get_scan_results(db: Session, scan_id: int) -> Optional[Dict[str, Any]]:
     Returns:
         Scan results if found, None otherwise
     """
-    db_scan = get_scan(db, scan_id)
-    if not db_scan:
+    result = get_scan_result_summary(db, scan_id)
+    if result is None:
         return None
     
-    # Get vulnerabilities
-    vulnerabilities = (
-        db.query(Vulnerability)
-        .filter(Vulnerability.scan_id == scan_id)
-        .all()
-    )
-    
-    # Create vulnerability summaries
-    vulnerability_summaries = []
-    for vuln in vulnerabilities:
-        vulnerability_summaries.append({
-            "id": vuln.id,
-            "title": vuln.title,
-            "severity": vuln.severity,
-            "cvss_score": vuln.cvss_score,
-            "cve_id": vuln.cve_id,
-            "status": vuln.status,
-            "priority_score": vuln.priority,
-        })
-    
-    # Create scan result
-    result = {
-        "scan_id": db_scan.id,
-        "scan_name": db_scan.name,
-        "status": db_scan.status,
-        "started_at": db_scan.started_at,
-        "completed_at": db_scan.completed_at,
-        "total_vulnerabilities": db_scan.vulnerabilities_count,
-        "critical_count": db_scan.critical_count,
-        "high_count": db_scan.high_count,
-        "medium_count": db_scan.medium_count,
-        "low_count": db_scan.low_count,
-        "vulnerabilities": vulnerability_summaries,
-    }
+    rows = db.execute(_scan_vulnerability_summaries_query(scan_id)).mappings()
+    result["vulnerabilities"] = [dict(row) for row in rows]
     
     return result
 
 
+async def get_scan_results_iter(
+    db: AsyncSession, scan_id: int, batch_size: int = 1000
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Iterate over the vulnerability summaries of a scan.
+    
+    Rows are read through a server-side cursor ``batch_size`` at a time, so memory
+    use does not grow with the number of vulnerabilities.
+    
+    Args:
+        db: Async database session
+        scan_id: ID of the scan
+        batch_size: Number of rows fetched per round-trip
+        
+    Yields:
+        Vulnerability summary dictionaries
+    """
+    stmt = _scan_vulnerability_summaries_query(scan_id).execution_options(yield_per=batch_size)
+    result = await db.stream(stmt)
+    async for row in result.mappings():
+        yield dict(row)
+
+
+# Vulnerability columns filled from scan findings, with the value used when a
+# finding does not have the field
+_FINDING_DEFAULTS = {
+    "title": "Unknown",
+    "description": "",
+    "cve_id": "",
+    "severity": "low",
+    "cvss_score": 0.0,
+    "cvss_vector": "",
+    "exploit_available": False,
+    "exploit_maturity": "",
+    "patch_available": False,
+    "affected_component": "",
+    "affected_version": "",
+    "business_impact": "",
+    "data_classification": "",
+    "system_exposure": "",
+    "metadata": {},
+}
+
+
+def _vulnerability_values(
+    scan_id: int, asset_id: int, finding: Dict[str, Any], now: datetime
+) -> Dict[str, Any]:
+    """
+    Map a scan finding to vulnerability column values.
+    
+    Args:
+        scan_id: ID of the scan
+        asset_id: ID of the asset
+        finding: Finding data
+        now: Creation timestamp
+        
+    Returns:
+        Vulnerability column values
+    """
+    # Merge in C rather than looking every field up in Python; findings only
+    # carry column fields, but anything else is dropped before the merge
+    if not finding.keys() <= _FINDING_DEFAULTS.keys():
+        finding = {key: value for key, value in finding.items() if key in _FINDING_DEFAULTS}
+    return {
+        **_FINDING_DEFAULTS,
+        **finding,
+        "asset_id": asset_id,
+        "scan_id": scan_id,
+        "status": "open",
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
 def create_vulnerability_from_finding(
     db: Session,
     scan_id: int,
@@ -313,32 +460,48 @@ def create_vulnerability_from_finding(
     Returns:
         Created vulnerability
     """
-    # Create vulnerability
-    vulnerability = Vulnerability(
-        title=finding.get("title", "Unknown"),
-        description=finding.get("description", ""),
-        cve_id=finding.get("cve_id", ""),
-        severity=finding.get("severity", "low"),
-        cvss_score=finding.get("cvss_score", 0.0),
-        cvss_vector=finding.get("cvss_vector", ""),
-        asset_id=asset_id,
-        scan_id=scan_id,
-        status="open",
-        exploit_available=finding.get("exploit_available", False),
-        exploit_maturity=finding.get("exploit_maturity", ""),
-        patch_available=finding.get("patch_available", False),
-        affected_component=finding.get("affected_component", ""),
-        affected_version=finding.get("affected_version", ""),
-        business_impact=finding.get("business_impact", ""),
-        data_classification=finding.get("data_classification", ""),
-        system_exposure=finding.get("system_exposure", ""),
-        metadata=finding.get("metadata", {}),
-        created_at=datetime.now(),
-        updated_at=datetime.now(),
-    )
-    
+    vulnerability = Vulnerability(**_vulnerability_values(scan_id, asset_id, finding, datetime.now()))
     db.add(vulnerability)
     db.commit()
-    db.refresh(vulnerability)
+    invalidate_summary(asset_id)
     logger.info(f"Created vulnerability with ID {vulnerability.id}")
-    return vulnerability 
\ No newline at end of file
+    return vulnerability
+
+
+def create_vulnerabilities_from_findings(
+    db: Session,
+    scan_id: int,
+    asset_id: int,
+    findings: List[Dict[str, Any]],
+    commit: bool = True,
+) -> int:
+    """
+    Create vulnerabilities for many scan findings with a single multi-row INSERT.
+    
+    Args:
+        db: Database session
+        scan_id: ID of the scan
+        asset_id: ID of the asset
+        findings: Finding data
+        commit: If False, leave the insert in the caller's open transaction; the
+            caller then commits and invalidates the asset's summary
+        
+    Returns:
+        Number of vulnerabilities created
+    """
+    if not findings:
+        return 0
+    
+    # All vulnerabilities of the batch share one timestamp, read once
+    now = datetime.now()
+    rows = [_vulnerability_values(scan_id, asset_id, finding, now) for finding in findings]
+    
+    # A Core insert on the table skips the identity map and unit of work entirely,
+    # which the legacy Session.bulk_insert_mappings still routes through; the
+    # driver sends the rows as multi-row INSERT ... VALUES pages
+    db.execute(insert(Vulnerability.__table__), rows)
+    if commit:
+        db.commit()
+        invalidate_summary(asset_id)
+    logger.info(f"Created {len(rows)} vulnerabilities for scan with ID {scan_id}")
+    return len(rows)
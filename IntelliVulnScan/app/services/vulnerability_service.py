@@ -2,10 +2,13 @@ import logging
 from datetime import datetime
 from typing import Dict, List, Any, Optional
 
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 
+from app.models.asset import Asset
+from app.models.scan import Scan
 from app.models.vulnerability import Vulnerability
 from app.schemas.vulnerability import VulnerabilityCreate, VulnerabilityUpdate
+from app.services.asset_service import invalidate_summary
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +24,8 @@ def create_vulnerability(db: Session, vulnerability: VulnerabilityCreate) -> Vul
     Returns:
         Created vulnerability
     """
+    # Creation and last update are the same instant, read once
+    now = datetime.now()
     db_vulnerability = Vulnerability(
         title=vulnerability.title,
         description=vulnerability.description,
@@ -40,12 +45,13 @@ def create_vulnerability(db: Session, vulnerability: VulnerabilityCreate) -> Vul
         data_classification=vulnerability.data_classification,
         system_exposure=vulnerability.system_exposure,
         metadata=vulnerability.metadata,
-        created_at=datetime.now(),
-        updated_at=datetime.now(),
+        created_at=now,
+        updated_at=now,
     )
     db.add(db_vulnerability)
     db.commit()
     db.refresh(db_vulnerability)
+    invalidate_summary(db_vulnerability.asset_id)
     logger.info(f"Created vulnerability with ID {db_vulnerability.id}")
     return db_vulnerability
 
@@ -69,15 +75,17 @@ def get_vulnerabilities(
     skip: int = 0,
     limit: int = 100,
     filters: Optional[Dict[str, Any]] = None,
+    after_id: Optional[int] = None,
 ) -> List[Vulnerability]:
     """
     Get vulnerabilities with optional filtering.
     
     Args:
         db: Database session
-        skip: Number of records to skip
+        skip: Number of records to skip (ignored when after_id is given)
         limit: Maximum number of records to return
         filters: Optional filters
+        after_id: Only return records with an ID greater than this (keyset pagination)
         
     Returns:
         List of vulnerabilities
@@ -104,7 +112,13 @@ def get_vulnerabilities(
         if "patch_available" in filters:
             query = query.filter(Vulnerability.patch_available == filters["patch_available"])
     
-    return query.offset(skip).limit(limit).all()
+    query = query.order_by(Vulnerability.id)
+    if after_id is not None:
+        query = query.filter(Vulnerability.id > after_id)
+    else:
+        query = query.offset(skip)
+    
+    return query.limit(limit).all()
 
 
 def update_vulnerability(
@@ -124,6 +138,7 @@ def update_vulnerability(
     db_vulnerability = get_vulnerability(db, vulnerability_id)
     if not db_vulnerability:
         return None
+    previous_asset_id = db_vulnerability.asset_id
     
     # Update fields
     for field, value in vulnerability.dict(exclude_unset=True).items():
@@ -132,6 +147,8 @@ def update_vulnerability(
     db_vulnerability.updated_at = datetime.now()
     db.commit()
     db.refresh(db_vulnerability)
+    invalidate_summary(previous_asset_id)
+    invalidate_summary(db_vulnerability.asset_id)
     logger.info(f"Updated vulnerability with ID {db_vulnerability.id}")
     return db_vulnerability
 
@@ -151,8 +168,10 @@ def delete_vulnerability(db: Session, vulnerability_id: int) -> bool:
     if not db_vulnerability:
         return False
     
+    asset_id = db_vulnerability.asset_id
     db.delete(db_vulnerability)
     db.commit()
+    invalidate_summary(asset_id)
     logger.info(f"Deleted vulnerability with ID {vulnerability_id}")
     return True
 
@@ -194,6 +213,7 @@ def update_vulnerability_status(
     
     db.commit()
     db.refresh(db_vulnerability)
+    invalidate_summary(db_vulnerability.asset_id)
     logger.info(f"Updated vulnerability status to {status} for vulnerability with ID {db_vulnerability.id}")
     return db_vulnerability
 
@@ -243,7 +263,20 @@ def get_vulnerability_details(db: Session, vulnerability_id: int) -> Optional[Di
     Returns:
         Vulnerability details if found, None otherwise
     """
-    db_vulnerability = get_vulnerability(db, vulnerability_id)
+    # Load the asset and scan in the same round-trip instead of lazily per attribute
+    db_vulnerability = (
+        db.query(Vulnerability)
+        .options(
+            joinedload(Vulnerability.asset).load_only(
+                Asset.id, Asset.name, Asset.asset_type, Asset.criticality
+            ),
+            joinedload(Vulnerability.scan).load_only(
+                Scan.id, Scan.name, Scan.scanner_type, Scan.status, Scan.created_at
+            ),
+        )
+        .filter(Vulnerability.id == vulnerability_id)
+        .first()
+    )
     if not db_vulnerability:
         return None
     
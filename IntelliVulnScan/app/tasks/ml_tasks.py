@@ -80,6 +80,40 @@ def train_model_task(
         }
 
 
+@celery_app.task(bind=True)
+def train_ml_model_task(self, model_id: int, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Celery task to train a stored ML model in the background.
+    
+    Args:
+        model_id: ID of the model to train
+        params: Training parameters
+        
+    Returns:
+        Dictionary with training results
+    """
+    logger.info(f"Starting training task {self.request.id} for model_id {model_id}")
+    
+    try:
+        # The session is closed on the way out, even if training raises
+        with SessionLocal() as db:
+            db_model = train_model_service(db=db, model_id=model_id, params=params or {})
+            status = db_model.status if db_model else "failed"
+        
+        logger.info(f"Training task {self.request.id} completed with status {status}")
+        return {
+            "status": status,
+            "model_id": model_id,
+        }
+    
+    except Exception as e:
+        logger.error(f"Error in training task {self.request.id}: {e}", exc_info=True)
+        return {
+            "status": "failed",
+            "message": str(e),
+        }
+
+
 @celery_app.task
 def retrain_model() -> Dict[str, Any]:
     """
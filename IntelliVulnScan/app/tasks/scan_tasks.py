@@ -1,22 +1,55 @@
 import logging
 import os
+import shutil
 import subprocess
-import json
+import tempfile
 from datetime import datetime
-from typing import Dict, Any, Optional, List
+from typing import BinaryIO, Dict, Any, Iterator, Optional, List
+
+import ijson
+import orjson
+from sqlalchemy.orm import Session
 
 from app.core.celery_app import celery_app
 from app.core.config import settings
 from app.core.database import SessionLocal
 from app.models.scan import Scan
 from app.models.vulnerability import Vulnerability
-from app.services.scan_service import update_scan_status, create_vulnerability_from_finding
+from app.services.scan_service import (
+    update_scan_status,
+    get_scan_severity_counts,
+    create_vulnerabilities_from_findings,
+)
 from app.services.notification_service import send_notification
 
 logger = logging.getLogger(__name__)
 
+# Scanner reports that can only be written to a file go to RAM-backed storage when available
+_REPORT_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+# Trivy command line parts: the fixed prefix, extra arguments per scan depth and
+# the subcommand per target type
+_TRIVY_BASE_CMD = (settings.TRIVY_PATH, "--format", "json", "--severity", "CRITICAL,HIGH,MEDIUM,LOW")
+_TRIVY_DEPTH_ARGS = {"quick": ("--light",), "deep": ("--list-all-pkgs",)}
+_TRIVY_TARGET_COMMANDS = {"container": ("image",), "repository": ("fs",)}
+
+# jq program reducing a Trivy report to one compact object per vulnerability,
+# holding only the fields findings are built from plus the result's target
+_TRIVY_JQ_FILTER = (
+    ".Results[]? | .Target as $target | .Vulnerabilities[]? | {Target: $target, VulnerabilityID,"
+    " Title, Description, Severity, InstalledVersion, FixedVersion, PkgName, ExploitAvailable,"
+    " References, CVSS: {nvd: (.CVSS.nvd // {})}} | with_entries(select(.value != null))"
+)
+_JQ_PATH = shutil.which(settings.JQ_PATH)
+
+# Read size for streamed scanner reports; large reads keep the parser from
+# waking up for every few kilobytes the scanner writes
+_REPORT_READ_SIZE = 1 << 20
 
-@celery_app.task(bind=True)
+
+# Results are recorded on the scan itself and nobody waits on the task, so its
+# return value is not stored in the result backend
+@celery_app.task(bind=True, ignore_result=True)
 def run_scan_task(self, scan_id: int) -> Dict[str, Any]:
     """
     Celery task to run a vulnerability scan in the background.
@@ -29,104 +62,116 @@ def run_scan_task(self, scan_id: int) -> Dict[str, Any]:
     """
     logger.info(f"Starting scan task {self.request.id} for scan_id {scan_id}")
     
-    try:
-        # Get database session
-        db = SessionLocal()
+    with SessionLocal() as db:
+        try:
+            return _run_scan(self.request.id, db, scan_id)
         
-        # Get scan from database
-        scan = db.query(Scan).filter(Scan.id == scan_id).first()
-        if not scan:
-            logger.error(f"Scan with ID {scan_id} not found")
-            db.close()
+        except Exception as e:
+            logger.error(f"Error in scan task {self.request.id}: {e}", exc_info=True)
+            
+            try:
+                # Update scan status on the same session, after discarding the failed work
+                db.rollback()
+                update_scan_status(db, scan_id, "failed", str(e))
+                
+                # Send notification
+                send_notification(
+                    title="Scan Failed",
+                    message=f"Scan failed with exception: {str(e)}",
+                    notification_type="error",
+                )
+            except Exception as inner_e:
+                logger.error(f"Error updating scan status: {inner_e}", exc_info=True)
+            
             return {
                 "status": "failed",
-                "message": f"Scan with ID {scan_id} not found",
+                "message": str(e),
             }
+
+
+def _run_scan(task_id: str, db: Session, scan_id: int) -> Dict[str, Any]:
+    """
+    Run a scan and record its results.
+    
+    Args:
+        task_id: ID of the Celery task running the scan
+        db: Database session
+        scan_id: ID of the scan to run
         
-        # Update scan status to running
-        scan.status = "running"
-        scan.started_at = datetime.now()
-        db.commit()
+    Returns:
+        Dictionary with scan results
+    """
+    # Get scan from database
+    scan = db.get(Scan, scan_id)
+    if not scan:
+        logger.error(f"Scan with ID {scan_id} not found")
+        return {
+            "status": "failed",
+            "message": f"Scan with ID {scan_id} not found",
+        }
+    
+    # Update scan status to running
+    scan.status = "running"
+    scan.started_at = datetime.now()
+    db.commit()
+    
+    # Run scan based on scanner type
+    if scan.scanner_type == "trivy":
+        results = run_trivy_scan(scan)
+    elif scan.scanner_type == "openvas":
+        results = run_openvas_scan(scan)
+    elif scan.scanner_type == "dependency-check":
+        results = run_dependency_check_scan(scan)
+    else:
+        logger.error(f"Unsupported scanner type: {scan.scanner_type}")
+        update_scan_status(db, scan_id, "failed", f"Unsupported scanner type: {scan.scanner_type}")
+        return {
+            "status": "failed",
+            "message": f"Unsupported scanner type: {scan.scanner_type}",
+        }
+    
+    # Process scan results
+    if results["status"] == "success":
+        # Process findings
+        findings = results["findings"]
+        process_scan_findings(db, scan_id, findings)
         
-        # Run scan based on scanner type
-        if scan.scanner_type == "trivy":
-            results = run_trivy_scan(scan)
-        elif scan.scanner_type == "openvas":
-            results = run_openvas_scan(scan)
-        elif scan.scanner_type == "dependency-check":
-            results = run_dependency_check_scan(scan)
-        else:
-            logger.error(f"Unsupported scanner type: {scan.scanner_type}")
-            update_scan_status(db, scan_id, "failed", f"Unsupported scanner type: {scan.scanner_type}")
-            db.close()
-            return {
-                "status": "failed",
-                "message": f"Unsupported scanner type: {scan.scanner_type}",
-            }
+        # Count the stored vulnerabilities per severity with one GROUP BY, rather
+        # than walking the findings again
+        severity_counts = get_scan_severity_counts(db, scan_id)
         
-        # Process scan results
-        if results["status"] == "success":
-            # Process findings
-            process_scan_findings(db, scan_id, results["findings"])
-            
-            # Update scan status
-            update_scan_status(
-                db,
-                scan_id,
-                "completed",
-                f"Scan completed successfully with {len(results['findings'])} findings",
-                vulnerabilities_count=len(results["findings"]),
-                critical_count=sum(1 for f in results["findings"] if f.get("severity") == "critical"),
-                high_count=sum(1 for f in results["findings"] if f.get("severity") == "high"),
-                medium_count=sum(1 for f in results["findings"] if f.get("severity") == "medium"),
-                low_count=sum(1 for f in results["findings"] if f.get("severity") == "low"),
-            )
-            
-            # Send notification
-            send_notification(
-                title="Scan Completed",
-                message=f"Scan '{scan.name}' completed successfully with {len(results['findings'])} findings",
-                notification_type="success",
-            )
-        else:
-            # Update scan status
-            update_scan_status(db, scan_id, "failed", results["message"])
-            
-            # Send notification
-            send_notification(
-                title="Scan Failed",
-                message=f"Scan '{scan.name}' failed: {results['message']}",
-                notification_type="error",
-            )
+        # Update scan status
+        update_scan_status(
+            db,
+            scan_id,
+            "completed",
+            f"Scan completed successfully with {len(findings)} findings",
+            vulnerabilities_count=sum(severity_counts.values()),
+            critical_count=severity_counts.get("critical", 0),
+            high_count=severity_counts.get("high", 0),
+            medium_count=severity_counts.get("medium", 0),
+            low_count=severity_counts.get("low", 0),
+        )
         
-        # Close database session
-        db.close()
+        # Send notification
+        send_notification(
+            title="Scan Completed",
+            message=f"Scan '{scan.name}' completed successfully with {len(findings)} findings",
+            notification_type="success",
+        )
+    else:
+        # Update scan status
+        update_scan_status(db, scan_id, "failed", results["message"])
         
-        logger.info(f"Scan task {self.request.id} completed with status {results['status']}")
-        return results
+        # Send notification
+        send_notification(
+            title="Scan Failed",
+            message=f"Scan '{scan.name}' failed: {results['message']}",
+            notification_type="error",
+        )
     
-    except Exception as e:
-        logger.error(f"Error in scan task {self.request.id}: {e}", exc_info=True)
-        
-        try:
-            # Update scan status
-            db = SessionLocal()
-            update_scan_status(db, scan_id, "failed", str(e))
-            db.close()
-            
-            # Send notification
-            send_notification(
-                title="Scan Failed",
-                message=f"Scan failed with exception: {str(e)}",
-                notification_type="error",
-            )
-        except Exception as inner_e:
-            logger.error(f"Error updating scan status: {inner_e}", exc_info=True)
-        
-        return {
-            "status": "failed",
-            "message": str(e),
-        }
+    logger.info(f"Scan task {task_id} completed with status {results['status']}")
+    return results
 
 
 def run_trivy_scan(scan: Scan) -> Dict[str, Any]:
@@ -142,63 +187,59 @@ def run_trivy_scan(scan: Scan) -> Dict[str, Any]:
     logger.info(f"Running Trivy scan for {scan.target_identifier}")
     
     try:
-        # Prepare command
+        # Prepare command: scan depth options, target type subcommand, then the target
         cmd = [
-            settings.TRIVY_PATH,
-            "--format", "json",
-            "--severity", "CRITICAL,HIGH,MEDIUM,LOW",
+            *_TRIVY_BASE_CMD,
+            *_TRIVY_DEPTH_ARGS.get(scan.scan_depth, ()),
+            *_TRIVY_TARGET_COMMANDS.get(scan.target_type, ()),
+            scan.target_identifier,
         ]
         
-        # Add scan depth
-        if scan.scan_depth == "quick":
-            cmd.extend(["--light"])
-        elif scan.scan_depth == "deep":
-            cmd.extend(["--list-all-pkgs"])
-        
-        # Add target type
-        if scan.target_type == "container":
-            cmd.append("image")
-        elif scan.target_type == "repository":
-            cmd.append("fs")
-        
-        # Add target identifier
-        cmd.append(scan.target_identifier)
-        
-        # Run command
-        logger.debug(f"Running command: {' '.join(cmd)}")
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        
-        # Parse output
-        output = json.loads(result.stdout)
-        
-        # Extract findings
-        findings = []
-        for result in output.get("Results", []):
-            for vuln in result.get("Vulnerabilities", []):
-                finding = {
-                    "title": vuln.get("Title", vuln.get("VulnerabilityID", "Unknown")),
-                    "description": vuln.get("Description", ""),
-                    "cve_id": vuln.get("VulnerabilityID", ""),
-                    "severity": vuln.get("Severity", "").lower(),
-                    "cvss_score": float(vuln.get("CVSS", {}).get("nvd", {}).get("V3Score", 0.0)),
-                    "cvss_vector": vuln.get("CVSS", {}).get("nvd", {}).get("V3Vector", ""),
-                    "affected_component": result.get("Target", ""),
-                    "affected_version": vuln.get("InstalledVersion", ""),
-                    "exploit_available": vuln.get("ExploitAvailable", False),
-                    "patch_available": vuln.get("FixedVersion", "") != "",
-                    "metadata": {
-                        "package_name": vuln.get("PkgName", ""),
-                        "fixed_version": vuln.get("FixedVersion", ""),
-                        "references": vuln.get("References", []),
-                    },
-                }
-                findings.append(finding)
+        # Run command, parsing its report as it is written instead of buffering it.
+        # stderr goes to a file so a chatty scanner cannot block on a full pipe.
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Running command: {' '.join(cmd)}")
+        with tempfile.TemporaryFile() as stderr, subprocess.Popen(
+            cmd, stdout=subprocess.PIPE, stderr=stderr, bufsize=_REPORT_READ_SIZE
+        ) as proc:
+            procs = [proc]
+            report, parse = proc.stdout, _iter_trivy_findings
+            if _JQ_PATH:
+                # jq drops the unused fields in C, so Python only decodes small objects
+                jq = subprocess.Popen(
+                    [_JQ_PATH, "-c", _TRIVY_JQ_FILTER],
+                    stdin=proc.stdout,
+                    stdout=subprocess.PIPE,
+                    stderr=stderr,
+                    bufsize=_REPORT_READ_SIZE,
+                )
+                proc.stdout.close()  # jq owns the read end now
+                procs.append(jq)
+                report, parse = jq.stdout, _iter_jq_trivy_findings
+            
+            parse_error = None
+            try:
+                findings = list(parse(report))
+            except (ijson.JSONError, orjson.JSONDecodeError) as e:
+                # A failed scan usually leaves no report; report the exit status first
+                findings, parse_error = [], e
+            finally:
+                report.close()
+            
+            for stage in procs:
+                if stage.wait() != 0:
+                    stderr.seek(0)
+                    raise subprocess.CalledProcessError(
+                        stage.returncode, stage.args, stderr=stderr.read().decode(errors="replace")
+                    )
+            if parse_error is not None:
+                raise parse_error
         
+        # The full report is never held in memory, so there is no raw_output
         return {
             "status": "success",
             "message": "Scan completed successfully",
             "findings": findings,
-            "raw_output": output,
         }
     
     except subprocess.CalledProcessError as e:
@@ -217,6 +258,68 @@ def run_trivy_scan(scan: Scan) -> Dict[str, Any]:
         }
 
 
+def _iter_trivy_findings(stream: BinaryIO) -> Iterator[Dict[str, Any]]:
+    """
+    Yield findings from a Trivy JSON report one target at a time.
+    
+    Args:
+        stream: Binary stream with the report
+        
+    Yields:
+        Finding dictionaries
+    """
+    for result in ijson.items(stream, "Results.item", use_float=True, buf_size=_REPORT_READ_SIZE):
+        target = result.get("Target", "")
+        for vuln in result.get("Vulnerabilities") or []:
+            yield _trivy_finding(target, vuln)
+
+
+def _iter_jq_trivy_findings(stream: BinaryIO) -> Iterator[Dict[str, Any]]:
+    """
+    Yield findings from the output of ``_TRIVY_JQ_FILTER``, one vulnerability per line.
+    
+    Args:
+        stream: Binary stream with the filtered report
+        
+    Yields:
+        Finding dictionaries
+    """
+    for line in stream:
+        vuln = orjson.loads(line)
+        yield _trivy_finding(vuln.get("Target", ""), vuln)
+
+
+def _trivy_finding(target: str, vuln: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Map a Trivy vulnerability to a finding.
+    
+    Args:
+        target: Target of the Trivy result the vulnerability belongs to
+        vuln: Trivy vulnerability
+        
+    Returns:
+        Finding dictionary
+    """
+    nvd = vuln.get("CVSS", {}).get("nvd", {})
+    return {
+        "title": vuln.get("Title", vuln.get("VulnerabilityID", "Unknown")),
+        "description": vuln.get("Description", ""),
+        "cve_id": vuln.get("VulnerabilityID", ""),
+        "severity": vuln.get("Severity", "").lower(),
+        "cvss_score": float(nvd.get("V3Score", 0.0)),
+        "cvss_vector": nvd.get("V3Vector", ""),
+        "affected_component": target,
+        "affected_version": vuln.get("InstalledVersion", ""),
+        "exploit_available": vuln.get("ExploitAvailable", False),
+        "patch_available": vuln.get("FixedVersion", "") != "",
+        "metadata": {
+            "package_name": vuln.get("PkgName", ""),
+            "fixed_version": vuln.get("FixedVersion", ""),
+            "references": vuln.get("References", []),
+        },
+    }
+
+
 def run_openvas_scan(scan: Scan) -> Dict[str, Any]:
     """
     Run an OpenVAS scan.
@@ -270,12 +373,14 @@ def run_openvas_scan(scan: Scan) -> Dict[str, Any]:
         },
     ]
     
-    return {
+    results = {
         "status": "success",
         "message": "Scan completed successfully",
         "findings": findings,
-        "raw_output": {"results": findings},
     }
+    if settings.DEBUG_SCAN_OUTPUT:
+        results["raw_output"] = {"results": findings}
+    return results
 
 
 def run_dependency_check_scan(scan: Scan) -> Dict[str, Any]:
@@ -291,31 +396,33 @@ def run_dependency_check_scan(scan: Scan) -> Dict[str, Any]:
     logger.info(f"Running Dependency-Check scan for {scan.target_identifier}")
     
     try:
-        # Prepare command
-        cmd = [
-            settings.DEPENDENCY_CHECK_PATH,
-            "--scan", scan.target_identifier,
-            "--format", "JSON",
-            "--out", f"dependency-check-report-{scan.id}.json",
-        ]
-        
-        # Add scan depth
-        if scan.scan_depth == "quick":
-            cmd.extend(["--disableRetireJS"])
-        elif scan.scan_depth == "deep":
-            cmd.extend(["--enableExperimental"])
-        
-        # Run command
-        logger.debug(f"Running command: {' '.join(cmd)}")
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        
-        # Read output file
-        report_path = f"dependency-check-report-{scan.id}.json"
-        with open(report_path, "r") as f:
-            output = json.load(f)
-        
-        # Clean up report file
-        os.remove(report_path)
+        # Dependency-Check can only write its report to a file; a unique temporary
+        # file keeps concurrent scans apart and is removed when it is closed
+        with tempfile.NamedTemporaryFile(suffix=".json", dir=_REPORT_DIR) as report:
+            # Prepare command
+            cmd = [
+                settings.DEPENDENCY_CHECK_PATH,
+                "--scan", scan.target_identifier,
+                "--format", "JSON",
+                "--out", report.name,
+            ]
+            
+            # Add scan depth
+            if scan.scan_depth == "quick":
+                cmd.extend(["--disableRetireJS"])
+            elif scan.scan_depth == "deep":
+                cmd.extend(["--enableExperimental"])
+            
+            # Run command
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Running command: {' '.join(cmd)}")
+            # Its console output is not used; stderr is kept as bytes and only
+            # decoded if the scan fails
+            subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, check=True)
+            
+            # Read the report by name, in case the tool replaced the file
+            with open(report.name, "rb") as f:
+                output = orjson.loads(f.read())
         
         # Extract findings
         findings = []
@@ -339,18 +446,21 @@ def run_dependency_check_scan(scan: Scan) -> Dict[str, Any]:
                 }
                 findings.append(finding)
         
-        return {
+        results = {
             "status": "success",
             "message": "Scan completed successfully",
             "findings": findings,
-            "raw_output": output,
         }
+        if settings.DEBUG_SCAN_OUTPUT:
+            results["raw_output"] = output
+        return results
     
     except subprocess.CalledProcessError as e:
-        logger.error(f"Dependency-Check scan failed: {e.stderr}")
+        stderr = e.stderr.decode(errors="replace")
+        logger.error(f"Dependency-Check scan failed: {stderr}")
         return {
             "status": "failed",
-            "message": f"Dependency-Check scan failed: {e.stderr}",
+            "message": f"Dependency-Check scan failed: {stderr}",
             "findings": [],
         }
     except Exception as e:
@@ -366,6 +476,9 @@ def process_scan_findings(db: Session, scan_id: int, findings: List[Dict[str, An
     """
     Process scan findings and create vulnerability records.
     
+    The records are not committed; update_scan_status commits them with the
+    scan's new status.
+    
     Args:
         db: Database session
         scan_id: ID of the scan
@@ -373,19 +486,15 @@ def process_scan_findings(db: Session, scan_id: int, findings: List[Dict[str, An
     """
     logger.info(f"Processing {len(findings)} findings for scan {scan_id}")
     
-    # Get scan
-    scan = db.query(Scan).filter(Scan.id == scan_id).first()
+    # Get scan; run_scan_task has already loaded it into this session
+    scan = db.get(Scan, scan_id)
     if not scan:
         logger.error(f"Scan with ID {scan_id} not found")
         return
     
-    # Process each finding
-    for finding in findings:
-        # Create vulnerability
-        create_vulnerability_from_finding(db, scan_id, scan.asset_id, finding)
-    
-    # Commit changes
-    db.commit()
+    # Insert all findings in one statement; the transaction is committed together
+    # with the scan's completed status
+    create_vulnerabilities_from_findings(db, scan_id, scan.asset_id, findings, commit=False)
     logger.info(f"Processed {len(findings)} findings for scan {scan_id}")
 
 
@@ -402,7 +511,7 @@ def update_vulnerability_database() -> Dict[str, Any]:
     try:
         # Update Trivy database
         cmd = [settings.TRIVY_PATH, "image", "--download-db-only"]
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+        subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, check=True)
         
         logger.info("Vulnerability database updated successfully")
         return {
@@ -1,26 +1,40 @@
+import asyncio
 import logging
 import os
 import sys
 import json
+import base64
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 import pandas as pd
 import numpy as np
-from sqlalchemy import create_engine
+import jwt
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from sqlalchemy.schema import CreateIndex, CreateTable, DropTable
 
 # Add the project root to the Python path
 sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
 
 from app.core.config import settings
-from app.core.database import Base
+from app.core.database import JSON_OPTIONS, Base
+from app.core.security import create_access_token, decode_access_token
 from app.models.asset import Asset
 from app.models.scan import Scan
 from app.models.vulnerability import Vulnerability
 from app.models.ml_model import MLModel
 from app.services.asset_service import create_asset
 from app.services.scan_service import create_scan, start_scan
-from app.services.ml_service import create_model, train_model, predict_vulnerability_priority
+from app.services.ml_service import (
+    create_model,
+    train_model,
+    predict_vulnerability_priority,
+    predict_vulnerability_priority_batched,
+    _build_feature_matrix,
+    _build_feature_matrix_from_frame,
+)
 from app.schemas.asset import AssetCreate
 from app.schemas.scan import ScanCreate
 from app.schemas.ml import MLModelCreate
@@ -34,17 +48,64 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def execute_ddl_script(engine, statements):
+    """Run DDL statements as a single SQLite script instead of one round-trip each."""
+    script = "".join(f"{str(statement.compile(dialect=engine.dialect)).strip()};\n" for statement in statements)
+    raw_connection = engine.raw_connection()
+    try:
+        raw_connection.driver_connection.executescript(script)
+    finally:
+        raw_connection.close()
+
+
 def setup_test_db():
     """Set up a test database."""
-    # Create a test database URL
-    test_db_url = "sqlite:///./test.db"
+    # Keep the test database in memory; StaticPool hands every session the same
+    # connection, so they all see the one in-memory database
+    engine = create_engine(
+        "sqlite+pysqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+        **JSON_OPTIONS,
+    )
+    
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        # Let SQLAlchemy emit BEGIN itself (below) so SAVEPOINTs work with pysqlite
+        dbapi_connection.isolation_level = None
+        
+        # Nothing here needs to survive a crash, so skip journaling and syncing
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=MEMORY")
+        cursor.execute("PRAGMA synchronous=OFF")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA cache_size=-64000")
+        cursor.close()
     
-    # Create engine and session
-    engine = create_engine(test_db_url)
-    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    @event.listens_for(engine, "begin")
+    def do_begin(conn):
+        conn.exec_driver_sql("BEGIN")
     
-    # Create tables
-    Base.metadata.create_all(bind=engine)
+    # Create tables and their indexes in one script
+    execute_ddl_script(
+        engine,
+        [
+            ddl
+            for table in Base.metadata.sorted_tables
+            for ddl in (CreateTable(table), *(CreateIndex(index) for index in table.indexes))
+        ],
+    )
+    
+    # Run the whole test in one transaction: the session joins it, and each
+    # commit made by the services only releases a SAVEPOINT
+    connection = engine.connect()
+    connection.begin()
+    SessionLocal = sessionmaker(
+        autocommit=False,
+        autoflush=False,
+        bind=connection,
+        join_transaction_mode="create_savepoint",
+    )
     
     return engine, SessionLocal()
 
@@ -113,10 +174,11 @@ def test_scan_execution(db, scan_id):
     
     # Run the scan task
     try:
-        # In a real application, this would be executed by Celery
-        # For testing, we'll run it directly
-        run_scan_task(scan_id)
-        logger.info("Scan task completed successfully")
+        # In a real application, this would be executed by a Celery worker.
+        # apply() runs it in-process but as a real task invocation (with a task
+        # ID and request context), without needing a broker.
+        result = run_scan_task.apply(args=(scan_id,), throw=True)
+        logger.info(f"Scan task completed with status {result.get()['status']}")
     except Exception as e:
         logger.error(f"Error running scan task: {str(e)}")
     
@@ -159,32 +221,69 @@ def test_ml_model_training(db, model_id):
     logger.info("Testing ML model training...")
     
     # Train the model
-    try:
-        # In a real application, this would be executed by Celery
-        # For testing, we'll run it directly
-        db_model = train_model(
-            db=db,
-            model_id=model_id,
-            params={
-                "hyperparameters": {
-                    "n_estimators": 100,
-                    "learning_rate": 0.1,
-                    "max_depth": 3,
-                },
+    # In a real application, this would be executed by Celery
+    # For testing, we'll run it directly
+    db_model = train_model(
+        db=db,
+        model_id=model_id,
+        params={
+            "hyperparameters": {
+                "n_estimators": 100,
+                "learning_rate": 0.1,
+                "max_depth": 3,
             },
-        )
-        
-        if db_model:
-            logger.info(f"Trained ML model: {db_model.name} (ID: {db_model.id})")
-            logger.info(f"Model metrics: {db_model.metrics}")
-        else:
-            logger.error("Error training ML model")
-    except Exception as e:
-        logger.error(f"Error training ML model: {str(e)}")
+        },
+    )
+    
+    assert db_model is not None, "Training did not return the model"
+    assert db_model.status == "trained", f"Model ended in status {db_model.status!r}"
+    logger.info(f"Trained ML model: {db_model.name} (ID: {db_model.id})")
+    logger.info(f"Model metrics: {db_model.metrics}")
     
     return db_model
 
 
+def test_feature_matrix_builders():
+    """Test that records and DataFrames of the same vulnerabilities encode identically."""
+    logger.info("Testing feature matrix builders...")
+    
+    records = [
+        {
+            "severity": "HIGH",
+            "cvss_score": 8.5,
+            "exploit_available": True,
+            "exploit_maturity": "functional",
+            "patch_available": False,
+            "business_impact": "high",
+            "data_classification": "confidential",
+            "system_exposure": "internet",
+        },
+        # Missing fields
+        {},
+        # Explicit None and empty values
+        {
+            "severity": None,
+            "cvss_score": None,
+            "exploit_available": None,
+            "patch_available": None,
+            "business_impact": "",
+            "system_exposure": None,
+        },
+        {"cvss_score": 3.1, "severity": "unknown"},
+    ]
+    
+    from_records = _build_feature_matrix(records)
+    from_frame = _build_feature_matrix_from_frame(pd.DataFrame(records))
+    np.testing.assert_array_equal(from_records, from_frame)
+    
+    # A frame without the column at all matches records without the keys
+    np.testing.assert_array_equal(
+        _build_feature_matrix([{}, {}]), _build_feature_matrix_from_frame(pd.DataFrame(index=range(2)))
+    )
+    
+    logger.info("Feature matrix builders agree")
+
+
 def test_vulnerability_prediction(db, model_id):
     """Test vulnerability prediction."""
     logger.info("Testing vulnerability prediction...")
@@ -221,13 +320,98 @@ def test_vulnerability_prediction(db, model_id):
         logger.error(f"Error predicting vulnerability priority: {str(e)}")
 
 
-def main():
-    """Run the test script."""
-    logger.info("Starting test script...")
+class RunSyncSession:
+    """Async stand-in for the request session: runs service functions on a sync session."""
     
-    # Set up test database
-    engine, db = setup_test_db()
+    def __init__(self, db, delay):
+        self.db = db
+        self.delay = delay
+        self.scoring = asyncio.Event()
     
+    async def run_sync(self, fn, *args, **kwargs):
+        # Yield for a while first, like a real database round-trip would
+        self.scoring.set()
+        await asyncio.sleep(self.delay)
+        return fn(self.db, *args, **kwargs)
+
+
+def test_batched_prediction(db, model_id):
+    """Test that batched predictions survive malformed and cancelled requests."""
+    logger.info("Testing batched vulnerability prediction...")
+    asyncio.run(run_batched_prediction(db, model_id))
+    logger.info("Batched predictions were isolated from failing requests")
+
+
+async def run_batched_prediction(db, model_id):
+    """Run concurrent batched predictions with a malformed and two cancelled requests."""
+    session = RunSyncSession(db, delay=0.05)
+    vulnerability_data = {"severity": "high", "cvss_score": 7.5, "exploit_available": True}
+    
+    def predict(data):
+        return asyncio.create_task(
+            predict_vulnerability_priority_batched(session, vulnerability_data=data, model_id=model_id)
+        )
+    
+    # A malformed request fails on its own; the others in its batch are scored
+    tasks = [predict({**vulnerability_data, "severity": 5} if i == 1 else vulnerability_data) for i in range(4)]
+    results = await asyncio.wait_for(asyncio.gather(*tasks, return_exceptions=True), 10)
+    assert isinstance(results[1], ValueError), results[1]
+    for i in (0, 2, 3):
+        assert results[i].model_id == model_id, results[i]
+    
+    # Cancel the leader while it scores, then the request it hands the batch to before
+    # that one resumes; the rest must still get results instead of waiting forever
+    session.scoring.clear()
+    tasks = [predict(vulnerability_data) for _ in range(5)]
+    await session.scoring.wait()
+    tasks[0].cancel()
+    asyncio.get_running_loop().call_soon(tasks[1].cancel)
+    results = await asyncio.wait_for(asyncio.gather(*tasks, return_exceptions=True), 10)
+    assert isinstance(results[0], asyncio.CancelledError), results[0]
+    assert isinstance(results[1], asyncio.CancelledError), results[1]
+    for result in results[2:]:
+        assert result.model_id == model_id, result
+
+
+def test_token_tampering():
+    """Test that tampered token signatures are rejected."""
+    logger.info("Testing token signature verification...")
+    
+    token = create_access_token(subject="test-user")
+    assert decode_access_token(token)["sub"] == "test-user"
+    
+    signing_input, signature_b64 = token.rsplit(".", 1)
+    signature = base64.urlsafe_b64decode(signature_b64 + "=" * (-len(signature_b64) % 4))
+    
+    # Flip one byte at each position of the signature; every variant must be rejected
+    for position in range(len(signature)):
+        tampered = bytearray(signature)
+        tampered[position] ^= 0x01
+        tampered_b64 = base64.urlsafe_b64encode(bytes(tampered)).rstrip(b"=").decode("ascii")
+        try:
+            decode_access_token(f"{signing_input}.{tampered_b64}")
+        except jwt.InvalidSignatureError:
+            continue
+        raise AssertionError(f"Tampered signature accepted (byte {position})")
+    
+    logger.info("All tampered signatures were rejected")
+
+
+def teardown_test_db(engine, db):
+    """Tear down a test database set up by setup_test_db."""
+    # Close database session and discard the test transaction
+    connection = db.get_bind()
+    db.close()
+    connection.rollback()
+    connection.close()
+    
+    # Drop tables in one script, dependents first
+    execute_ddl_script(engine, [DropTable(table) for table in reversed(Base.metadata.sorted_tables)])
+
+
+def run_asset_chain():
+    """Run the asset and scan tests against their own database."""
+    engine, db = setup_test_db()
     try:
         # Test asset creation
         asset = test_asset_creation(db)
@@ -237,7 +421,18 @@ def main():
         
         # Test scan execution
         test_scan_execution(db, scan.id)
-        
+    
+    except Exception as e:
+        logger.error(f"Error running asset and scan tests: {str(e)}")
+    
+    finally:
+        teardown_test_db(engine, db)
+
+
+def run_ml_chain():
+    """Run the ML model tests against their own database."""
+    engine, db = setup_test_db()
+    try:
         # Test ML model creation
         model = test_ml_model_creation(db)
         
@@ -245,18 +440,36 @@ def main():
         trained_model = test_ml_model_training(db, model.id)
         
         # Test vulnerability prediction
-        if trained_model and trained_model.status == "trained":
-            test_vulnerability_prediction(db, trained_model.id)
+        test_vulnerability_prediction(db, trained_model.id)
+        
+        # Test batched prediction
+        test_batched_prediction(db, trained_model.id)
     
     except Exception as e:
-        logger.error(f"Error running test script: {str(e)}")
+        # Unlike the scan chain, this needs no external tools, so failures fail the run
+        logger.error(f"Error running ML tests: {str(e)}")
+        raise
     
     finally:
-        # Close database session
-        db.close()
-        
-        # Drop tables
-        Base.metadata.drop_all(bind=engine)
+        teardown_test_db(engine, db)
+
+
+def main():
+    """Run the test script."""
+    logger.info("Starting test script...")
+    
+    # Test token signature verification; a rejected check fails the run
+    test_token_tampering()
+    
+    # Test feature encoding; a mismatch fails the run
+    test_feature_matrix_builders()
+    
+    # The scan chain waits on the scanner subprocess while the ML chain trains, so
+    # run them side by side; each has its own in-memory database and shares nothing
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = [executor.submit(run_asset_chain), executor.submit(run_ml_chain)]
+        for future in futures:
+            future.result()
     
     logger.info("Test script completed")
 